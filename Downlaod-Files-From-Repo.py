@@ -1,60 +1,412 @@
 import requests
 import os
+import json
+import time
+import tarfile
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from getpass import getpass
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as RawStreamError
 
-def download_file_from_github(repo, file_name, output_path, token=None):
-    url = f"https://raw.githubusercontent.com/{repo}/main/{file_name}"
+# GitHub endpoints
+RAW_BASE = "https://raw.githubusercontent.com"
+API_BASE = "https://api.github.com"
+
+DEFAULT_WORKERS = 8
+# (connect, read) seconds; the read timeout applies per socket read, so a stalled
+# transfer fails instead of hanging its worker forever.
+REQUEST_TIMEOUT = (10, 60)
+CHUNK_SIZE = 64 * 1024
+MANIFEST_NAME = ".repo-sync-manifest.json"
+# Above this many selected files a single tarball beats per-file raw requests.
+ARCHIVE_THRESHOLD = 20
+
+def create_session(pool_size=DEFAULT_WORKERS):
+    """Create a keep-alive session whose connection pool matches the worker count."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def stream_to_file(http, url, output_path, headers, auth=None):
+    """Stream url into output_path without buffering the body in memory.
+
+    Chunks are written to "<output_path>.part" and the response's ETag to
+    "<output_path>.part.etag". If a partial file is left over from an
+    interrupted run, the transfer resumes with a Range request guarded by
+    If-Range, so a partial of an older version is discarded rather than
+    completed with the new one's tail. The finished file is renamed into place
+    atomically, so output_path is never left truncated. Returns (response, size);
+    size is None on failure.
+    """
+    part_path = output_path + ".part"
+    etag_path = part_path + ".etag"
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    saved_etag = None
+    if offset and os.path.exists(etag_path):
+        with open(etag_path) as f:
+            saved_etag = f.read().strip() or None
+    if offset and not saved_etag:
+        # Nothing to prove the partial is the current version; start over.
+        os.remove(part_path)
+        offset = 0
+    headers = dict(headers)
+    # Ranges must refer to the bytes on disk, so ask for an unencoded body.
+    headers["Accept-Encoding"] = "identity"
+    if offset:
+        headers["Range"] = f"bytes={offset}-"
+        headers["If-Range"] = saved_etag
+
+    with http.get(url, headers=headers, auth=auth, stream=True, timeout=REQUEST_TIMEOUT) as response:
+        content_range = response.headers.get("Content-Range", "")
+        if offset and (response.status_code == 416 or
+                       (response.status_code == 206 and response.headers.get("ETag") != saved_etag)):
+            # The leftover partial doesn't match the remote file any more; start over.
+            response.content
+            os.remove(part_path)
+            del headers["Range"], headers["If-Range"]
+            return stream_to_file(http, url, output_path, headers, auth)
+
+        if response.status_code == 206 and content_range.startswith(f"bytes {offset}-"):
+            mode = "ab"
+        elif response.status_code == 200:
+            # Fresh download, or the server ignored Range / If-Range and sent the whole file.
+            mode, offset = "wb", 0
+            if response.headers.get("ETag"):
+                with open(etag_path, "w") as f:
+                    f.write(response.headers["ETag"])
+            elif os.path.exists(etag_path):
+                os.remove(etag_path)
+        else:
+            response.content  # read the error body before the connection is released
+            return response, None
+
+        written = 0
+        with open(part_path, mode) as f:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                f.write(chunk)
+                written += len(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+
+    os.replace(part_path, output_path)
+    if os.path.exists(etag_path):
+        os.remove(etag_path)
+    return response, offset + written
+
+def download_file_from_github(repo, file_name, output_path, token=None, session=None, prompt_auth=True, etags=None, ref="main"):
+    """Download a single file from the repository.
+
+    etags is an optional dict of file_name -> ETag. A known ETag is sent as
+    If-None-Match so an unchanged file costs a 304, and the dict is updated
+    with the ETag of each successful response.
+    """
+    url = f"{RAW_BASE}/{repo}/{ref}/{file_name}"
     headers = {"Accept": "application/vnd.github.v3.raw"}
-    
+    http = session or requests
+
+    if etags is not None and etags.get(file_name) and os.path.exists(output_path):
+        headers["If-None-Match"] = etags[file_name]
+
     if token:
         headers["Authorization"] = f"token {token}"
         auth_mode = "Token Authentication"
     else:
         auth_mode = "Username/Password Authentication"
 
-    response = requests.get(url, headers=headers)
-    
-    if response.status_code == 200:
-        with open(output_path, 'wb') as f:
-            f.write(response.content)
+    response, size = stream_to_file(http, url, output_path, headers)
+
+    if response.status_code == 304:
+        print(f"File unchanged, skipped: {output_path}")
+        return os.path.getsize(output_path)
+    elif size is not None:
+        if etags is not None and response.headers.get("ETag"):
+            etags[file_name] = response.headers["ETag"]
         print(f"File downloaded successfully using {auth_mode}: {output_path}")
-    elif response.status_code == 404 and not token:
+        return size
+    elif response.status_code == 404 and not token and prompt_auth:
         # Retry with username/password authentication if token fails and token is not provided
         username = input("Enter your GitHub username: ")
         password = getpass("Enter your GitHub password: ")
         auth = (username, password)
-        response = requests.get(url, headers=headers, auth=auth)
-        
-        if response.status_code == 200:
-            with open(output_path, 'wb') as f:
-                f.write(response.content)
+        response, size = stream_to_file(http, url, output_path, headers, auth=auth)
+
+        if size is not None:
+            if etags is not None and response.headers.get("ETag"):
+                etags[file_name] = response.headers["ETag"]
             print(f"File downloaded successfully using {auth_mode}: {output_path}")
+            return size
         else:
             print(f"Failed to download file '{file_name}' using {auth_mode}: {response.status_code} - {response.text}")
     else:
         print(f"Failed to download file '{file_name}' using {auth_mode}: {response.status_code} - {response.text}")
+    return None
+
+def list_entries(repo, token=None, session=None, etag=None, ref=None):
+    """Fetch the root contents listing as a {file_name: blob_sha} dict.
+
+    Sends If-None-Match when an etag is given; a 304 doesn't count against the
+    API rate limit. Returns (status_code, entries, etag); entries is None when
+    the listing is unchanged (304) or the request failed.
+    """
+    url = f"{API_BASE}/repos/{repo}/contents/"
+    if ref:
+        url += f"?ref={ref}"
+    headers = {}
+    if token:
+        headers["Authorization"] = f"token {token}"
+    if etag:
+        headers["If-None-Match"] = etag
+    response = (session or requests).get(url, headers=headers, timeout=REQUEST_TIMEOUT)
 
-def list_files(repo):
-    url = f"https://api.github.com/repos/{repo}/contents/"
-    response = requests.get(url)
-    
     if response.status_code == 200:
-        files = [item['name'] for item in response.json() if item['type'] == 'file']
-        return files
+        entries = {item['name']: item['sha'] for item in response.json() if item['type'] == 'file'}
+        return response.status_code, entries, response.headers.get("ETag")
+    elif response.status_code == 304:
+        return response.status_code, None, etag
     else:
         print(f"Failed to list files: {response.status_code} - {response.text}")
+        return response.status_code, None, None
+
+def list_files(repo, token=None, ref=None):
+    _, entries, _ = list_entries(repo, token, ref=ref)
+    return list(entries) if entries else []
+
+def list_tree(repo, ref="main", token=None, session=None):
+    """List every file in the repository at ref with a single recursive git-trees call.
+
+    ref may be a branch, tag or commit SHA. Returns {path: blob_sha}.
+    """
+    url = f"{API_BASE}/repos/{repo}/git/trees/{ref}?recursive=1"
+    headers = {"Accept": "application/vnd.github+json"}
+    if token:
+        headers["Authorization"] = f"token {token}"
+    response = (session or requests).get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+
+    if response.status_code == 200:
+        tree = response.json()
+        if tree.get("truncated"):
+            print("Warning: tree listing was truncated by GitHub; some files are missing.")
+        return {item['path']: item['sha'] for item in tree['tree'] if item['type'] == 'blob'}
+    else:
+        print(f"Failed to list tree for '{ref}': {response.status_code} - {response.text}")
+        return {}
+
+def fetch_archive(repo, paths, output_dir, ref="main", token=None):
+    """Download one tarball of ref and stream-extract only the given paths.
+
+    The archive is read straight off the socket ("r|gz"), so nothing but the
+    selected files ever touches the disk. Zipballs aren't used because the zip
+    central directory sits at the end of the file and can't be streamed.
+    """
+    url = f"{API_BASE}/repos/{repo}/tarball/{ref}"
+    headers = {}
+    if token:
+        headers["Authorization"] = f"token {token}"
+    wanted = set(paths)
+    output_root = os.path.abspath(output_dir)
+    results = []
+
+    run_started = time.perf_counter()
+    part_path = None
+    error = None
+    try:
+        with requests.get(url, headers=headers, stream=True, timeout=REQUEST_TIMEOUT) as response:
+            if response.status_code != 200:
+                print(f"Failed to download archive for '{ref}': {response.status_code} - {response.text}")
+                return []
+            response.raw.decode_content = True
+            with tarfile.open(fileobj=response.raw, mode="r|gz") as archive:
+                for member in archive:
+                    # Members are prefixed with "<owner>-<repo>-<sha>/".
+                    rel_path = member.name.split("/", 1)[-1]
+                    if not member.isfile() or rel_path not in wanted:
+                        continue
+                    output_path = os.path.abspath(os.path.join(output_root, rel_path))
+                    if not output_path.startswith(output_root + os.sep):
+                        print(f"Skipping unsafe archive path: {member.name}")
+                        continue
+
+                    started = time.perf_counter()
+                    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+                    part_path = output_path + ".part"
+                    with archive.extractfile(member) as src, open(part_path, "wb") as dst:
+                        while chunk := src.read(CHUNK_SIZE):
+                            dst.write(chunk)
+                    os.replace(part_path, output_path)
+                    part_path = None
+                    wanted.discard(rel_path)
+                    results.append((rel_path, member.size, time.perf_counter() - started))
+                    print(f"Extracted: {output_path}")
+    # response.raw raises urllib3's errors rather than requests'; a cut gzip stream raises EOFError
+    except (requests.RequestException, RawStreamError, tarfile.TarError, EOFError, OSError) as e:
+        # e.g. the connection reset mid-stream: keep what was extracted, fail the rest
+        error = e
+        print(f"Archive download for '{ref}' failed: {e}")
+        if part_path and os.path.exists(part_path):
+            os.remove(part_path)
+    elapsed = time.perf_counter() - run_started
+
+    for rel_path in sorted(wanted):
+        if error is None:
+            print(f"Not found in archive: {rel_path}")
+        results.append((rel_path, None, 0.0))
+    print_download_summary(results, elapsed, f"tarball of {ref}")
+    return results
+
+def bulk_download(repo, output_dir, prefixes=None, ref="main", token=None, max_workers=DEFAULT_WORKERS):
+    """Seed output_dir with every file under the given path prefixes at ref.
+
+    Small selections go through the per-file worker pool; larger ones are
+    fetched as a single tarball.
+    """
+    tree = list_tree(repo, ref, token)
+    if not tree:
+        print("No files found in the repository.")
+        return []
+
+    prefixes = [p.strip("/") for p in prefixes or [""]]
+    selected = sorted(
+        path for path in tree
+        if any(not p or path == p or path.startswith(p + "/") for p in prefixes)
+    )
+    if not selected:
+        print("No files matched the requested paths.")
         return []
 
-def download_selected_files(repo, output_dir, token=None):
-    files = list_files(repo)
+    os.makedirs(output_dir, exist_ok=True)
+    print(f"{len(selected)} of {len(tree)} file(s) selected at '{ref}'.")
+    if len(selected) >= ARCHIVE_THRESHOLD:
+        return fetch_archive(repo, selected, output_dir, ref, token)
+    return download_files(repo, selected, output_dir, token, max_workers, ref=ref)
+
+def load_manifest(manifest_path):
+    """Load the sync manifest, or an empty one if it doesn't exist yet."""
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"listing_etag": None, "listing": {}, "files": {}}
+
+def save_manifest(manifest_path, manifest):
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+def sync_files(repo, output_dir, token=None, file_names=None, max_workers=DEFAULT_WORKERS, ref="main"):
+    """Bring output_dir up to date with the repository, downloading only changed files.
+
+    The manifest in output_dir records the listing ETag plus each file's blob
+    SHA and raw ETag. An unchanged repository costs one conditional API call.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+
+    status, entries, etag = list_entries(repo, token, etag=manifest.get("listing_etag"), ref=ref)
+    if status == 304:
+        print("Repository listing unchanged (304).")
+        entries = manifest["listing"]
+    elif entries is None:
+        return []
+    manifest["listing_etag"] = etag
+    manifest["listing"] = entries
+
+    wanted = [name for name in (file_names or entries) if name in entries]
+    for name in set(file_names or []) - set(wanted):
+        print(f"Not found in repository, skipped: {name}")
+
+    tracked = manifest["files"]
+    changed = [
+        name for name in wanted
+        if tracked.get(name, {}).get("sha") != entries[name]
+        or not os.path.exists(os.path.join(output_dir, name))
+    ]
+    print(f"{len(wanted) - len(changed)} file(s) up to date, {len(changed)} to download.")
+
+    results = []
+    if changed:
+        etags = {name: tracked.get(name, {}).get("etag") for name in changed}
+        results = download_files(repo, changed, output_dir, token, max_workers, etags=etags, ref=ref)
+        for name, size, _ in results:
+            if size is not None:
+                tracked[name] = {"sha": entries[name], "etag": etags.get(name)}
+
+    # Forget files that were removed from the repository.
+    for name in list(tracked):
+        if name not in entries:
+            del tracked[name]
+    save_manifest(manifest_path, manifest)
+    return results
+
+def download_files(repo, file_names, output_dir, token=None, max_workers=DEFAULT_WORKERS, etags=None, ref="main"):
+    """Download files over a shared session using a bounded worker pool.
+
+    Returns a list of (file_name, bytes_written, seconds) tuples; bytes_written
+    is None for files that failed.
+    """
+    max_workers = max(1, max_workers)
+    # Only prompt for username/password when running sequentially; concurrent
+    # workers can't share the terminal.
+    prompt_auth = max_workers == 1
+
+    def fetch(file_name):
+        started = time.perf_counter()
+        output_path = os.path.join(output_dir, file_name)
+        try:
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            size = download_file_from_github(repo, file_name, output_path, token, session=session,
+                                             prompt_auth=prompt_auth, etags=etags, ref=ref)
+        except (requests.RequestException, OSError) as e:
+            # One reset connection or full disk fails this file, not the whole batch.
+            print(f"Failed to download file '{file_name}': {e}")
+            size = None
+        return file_name, size, time.perf_counter() - started
+
+    results = []
+    run_started = time.perf_counter()
+    with create_session(max_workers) as session, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(fetch, file_name) for file_name in file_names]
+        for future in as_completed(futures):
+            results.append(future.result())
+    elapsed = time.perf_counter() - run_started
+
+    print_download_summary(results, elapsed, f"{max_workers} worker(s)")
+    return results
+
+def print_download_summary(results, elapsed, label):
+    """Print bytes, throughput and per-file latency for a download run."""
+    succeeded = [r for r in results if r[1] is not None]
+    failed = [r for r in results if r[1] is None]
+    total_bytes = sum(r[1] for r in succeeded)
+    latencies = sorted(r[2] for r in results)
+
+    print(f"\nDownload summary ({label}):")
+    print(f"  Files:      {len(succeeded)} succeeded, {len(failed)} failed")
+    print(f"  Bytes:      {total_bytes} ({total_bytes / 1024:.1f} KiB)")
+    print(f"  Wall time:  {elapsed:.2f}s")
+    if elapsed > 0:
+        print(f"  Throughput: {len(succeeded) / elapsed:.2f} files/sec, {total_bytes / 1024 / elapsed:.1f} KiB/sec")
+    if latencies:
+        p50 = latencies[len(latencies) // 2]
+        print(f"  Latency:    min {latencies[0] * 1000:.0f}ms, p50 {p50 * 1000:.0f}ms, max {latencies[-1] * 1000:.0f}ms")
+    for file_name, size, seconds in sorted(results, key=lambda r: r[2], reverse=True):
+        status = f"{size} bytes" if size is not None else "FAILED"
+        print(f"    {seconds * 1000:8.0f}ms  {file_name} ({status})")
+
+def download_selected_files(repo, output_dir, token=None, max_workers=DEFAULT_WORKERS, ref="main"):
+    files = list_files(repo, token, ref)
     if not files:
         print("No files found in the repository.")
         return
-    
+
     print("List of files in the repository:")
     for index, file_name in enumerate(files, start=1):
         print(f"{index}. {file_name}")
-    
+
     try:
         choices = input("\nEnter the numbers of the files you want to download (comma-separated): ").strip()
         selected_indices = [int(i.strip()) - 1 for i in choices.split(",")]
@@ -66,13 +418,34 @@ def download_selected_files(repo, output_dir, token=None):
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
-    for file_name in selected_files:
-        output_path = os.path.join(output_dir, file_name)
-        download_file_from_github(repo, file_name, output_path, token)
+    download_files(repo, selected_files, output_dir, token, max_workers, ref=ref)
 
-# Example usage
-repo = "trishanetrx/myconfigscripts"  # Replace with your GitHub repository path
-#output_dir = "/home"  # Replace with the desired local output directory
-output_dir = os.getcwd() 
+def cli(argv=None, prog=None):
+    """Command-line entry point; argv defaults to sys.argv[1:]."""
+    parser = argparse.ArgumentParser(prog=prog, description="Download selected files from a GitHub repository.")
+    parser.add_argument("--repo", default="trishanetrx/myconfigscripts", help="GitHub repository path (owner/name)")
+    parser.add_argument("--output-dir", default=os.getcwd(), help="Local output directory (default: current directory)")
+    parser.add_argument("--token", default=os.environ.get("GITHUB_TOKEN"), help="GitHub token (default: $GITHUB_TOKEN)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Maximum concurrent downloads (default: {DEFAULT_WORKERS}, 1 = sequential)")
+    parser.add_argument("--sync", action="store_true",
+                        help=f"Non-interactively sync files, skipping ones unchanged since the last run ({MANIFEST_NAME})")
+    parser.add_argument("--files", help="Comma-separated file names to sync (default: every file in the repository)")
+    parser.add_argument("--ref", default="main", help="Branch, tag or commit to download from (default: main)")
+    parser.add_argument("--bulk", action="store_true",
+                        help="Non-interactively fetch the whole tree (or --paths) recursively, "
+                             f"using one tarball for {ARCHIVE_THRESHOLD}+ files")
+    parser.add_argument("--paths", help="Comma-separated files or directories for --bulk (default: everything)")
+    args = parser.parse_args(argv)
+
+    if args.bulk:
+        prefixes = args.paths.split(",") if args.paths else None
+        bulk_download(args.repo, args.output_dir, prefixes, args.ref, args.token, args.workers)
+    elif args.sync:
+        file_names = [name.strip() for name in args.files.split(",")] if args.files else None
+        sync_files(args.repo, args.output_dir, args.token, file_names, args.workers, args.ref)
+    else:
+        download_selected_files(args.repo, args.output_dir, args.token, args.workers, args.ref)
 
-download_selected_files(repo, output_dir)
+if __name__ == "__main__":
+    cli()
@@ -1,78 +1,380 @@
+import argparse
+import json
 import os
+import re
 import subprocess
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 
-def run_command(command):
-    """Run a shell command and print the output."""
+DEFAULT_JOBS = 2
+# Seconds between xfs_repair's own progress reports (xfs_repair -t)
+XFS_PROGRESS_INTERVAL = 30
+XFS_PHASE_RE = re.compile(r"^Phase (\d+) - (.*?)\.*$")
+XFS_PHASE_COUNT = 7
+
+class CommandResult(namedtuple("CommandResult", "returncode output seconds")):
+    @property
+    def ok(self):
+        return self.returncode == 0
+
+def run_command(command, label=None, on_line=None):
+    """Run a command given as an argument list, streaming its output line by line.
+
+    stderr is merged into stdout. on_line, if given, is called with each
+    line as it arrives. Always returns a CommandResult, including when the
+    command fails or can't be started.
+    """
+    prefix = f"[{label}] " if label else ""
+    started = time.perf_counter()
+    lines = []
     try:
-        output = subprocess.check_output(command, shell=True, universal_newlines=True)
-        print(output)
-        return output
-    except subprocess.CalledProcessError as e:
-        print(f"Command failed: {e}")
-        return None
-
-def main():
-    # Step 1: Display available disks using lsblk
-    print("Listing all block devices:\n")
-    run_command("lsblk")
-    
-    # Step 2: Ask the user for the disk (e.g., /dev/sdX)
-    disk = input("Enter the disk on which to run the recovery operation (e.g., /dev/sdc2): ")
-    
-    # Ensure the user input includes /dev/ prefix
-    if not disk.startswith("/dev/"):
-        disk = f"/dev/{disk}"
-    
-    # Confirm the user's choice
-    confirm = input(f"You have selected {disk}. Do you want to continue? (yes/no): ").lower()
-    if confirm != 'yes':
-        print("Operation cancelled by the user.")
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                   universal_newlines=True, bufsize=1)
+    except OSError as e:
+        print(f"{prefix}Command failed: {e}")
+        return CommandResult(127, str(e), time.perf_counter() - started)
+
+    with process:
+        for line in process.stdout:
+            line = line.rstrip("\n")
+            lines.append(line)
+            print(f"{prefix}{line}", flush=True)
+            if on_line:
+                on_line(line)
+    seconds = time.perf_counter() - started
+    if process.returncode != 0:
+        print(f"{prefix}Command failed with exit code {process.returncode}: {' '.join(command)}")
+    return CommandResult(process.returncode, "\n".join(lines), seconds)
+
+class XfsRepairPhases:
+    """Tracks xfs_repair's "Phase N - ..." lines and how long each phase took."""
+
+    def __init__(self, label=None):
+        self.prefix = f"[{label}] " if label else ""
+        self.phases = []
+        self.current = None
+
+    def __call__(self, line):
+        match = XFS_PHASE_RE.match(line.strip())
+        if not match:
+            return
+        now = time.perf_counter()
+        self._close(now)
+        self.current = {"phase": int(match.group(1)), "description": match.group(2).strip(), "started": now}
+        print(f"{self.prefix}xfs_repair progress: phase {self.current['phase']}/{XFS_PHASE_COUNT}", flush=True)
+
+    def _close(self, now):
+        if self.current:
+            started = self.current.pop("started")
+            self.current["seconds"] = round(now - started, 3)
+            self.phases.append(self.current)
+            self.current = None
+
+    def finish(self):
+        self._close(time.perf_counter())
+        return self.phases
+
+def _timed_step(result, step, command, label, on_line=None):
+    """Run one recovery step and record its wall-clock time in result["steps"]."""
+    outcome = run_command(command, label, on_line)
+    result["steps"].append({"step": step, "seconds": round(outcome.seconds, 3), "returncode": outcome.returncode})
+    return outcome
+
+# Commands whose JSON output makes up a discovery snapshot; recorded copies can be
+# loaded from <fixture dir>/<name>.json instead of probing real disks.
+DISCOVERY_COMMANDS = {
+    "lsblk": ["lsblk", "--json", "--bytes", "--output", "NAME,PATH,TYPE,FSTYPE,UUID,SIZE,MOUNTPOINT"],
+    "pvs": ["sudo", "pvs", "--reportformat", "json", "--units", "b", "-o", "pv_name,pv_uuid,vg_name"],
+    "lvs": ["sudo", "lvs", "--reportformat", "json", "--units", "b", "-o", "lv_name,vg_name,lv_path,lv_size"],
+}
+
+class BlockDeviceIndex:
+    """One snapshot of disks, partitions, PVs, VGs and LVs built from lsblk/pvs/lvs JSON.
+
+    Everything the recovery needs to know about block devices is answered
+    from this snapshot rather than by probing the system again.
+    """
+
+    def __init__(self, lsblk, pvs, lvs):
+        self.devices = {}
+        for device in lsblk.get("blockdevices", []):
+            self._add_device(device, parent=None)
+        self.pvs = {pv["pv_name"]: pv for report in pvs.get("report", []) for pv in report.get("pv", [])}
+        self.vg_by_pv_uuid = {pv["pv_uuid"]: pv["vg_name"] for pv in self.pvs.values() if pv.get("vg_name")}
+        self.lvs = {}
+        for report in lvs.get("report", []):
+            for lv in report.get("lv", []):
+                self.lvs.setdefault(lv["vg_name"], []).append(lv)
+
+    def _add_device(self, device, parent):
+        path = device.get("path") or f"/dev/{device['name']}"
+        children = device.get("children", [])
+        self.devices[path] = {
+            "name": device["name"],
+            "path": path,
+            "type": device.get("type"),
+            "fstype": device.get("fstype"),
+            "uuid": device.get("uuid"),
+            "size": int(device.get("size") or 0),
+            "mountpoint": device.get("mountpoint"),
+            "parent": parent,
+            "children": [child.get("path") or f"/dev/{child['name']}" for child in children],
+        }
+        for child in children:
+            self._add_device(child, parent=path)
+
+    def _in_use(self, path):
+        """True if the device or anything stacked on it (e.g. the running OS's LVs) is mounted."""
+        device = self.devices[path]
+        return bool(device["mountpoint"]) or any(self._in_use(child) for child in device["children"])
+
+    def vg_for(self, path):
+        """VG name recorded on a PV. Clones of the running OS disk are hidden from pvs as
+        duplicates, so fall back to the VG of the PV with the same UUID."""
+        pv = self.pvs.get(path)
+        if pv and pv.get("vg_name"):
+            return pv["vg_name"]
+        uuid = (self.devices.get(path) or {}).get("uuid")
+        return self.vg_by_pv_uuid.get(uuid)
+
+    def lv_names_for(self, path):
+        """Names of the logical volumes in the VG stored on a PV."""
+        return [lv["lv_name"] for lv in self.lvs.get(self.vg_for(path), [])]
+
+    def candidates(self, lv_name="rootlv"):
+        """Unmounted LVM PVs, not used by the running system, whose VG holds lv_name."""
+        return [
+            path for path, device in self.devices.items()
+            if device["fstype"] == "LVM2_member" and not self._in_use(path) and lv_name in self.lv_names_for(path)
+        ]
+
+    def print_summary(self, lv_name="rootlv"):
+        print(f"{'DEVICE':16} {'TYPE':6} {'SIZE':>10} {'FSTYPE':12} {'VG':12} MOUNTPOINT")
+        for path, device in self.devices.items():
+            vg = self.vg_for(path) if device["fstype"] == "LVM2_member" else ""
+            print(f"{path:16} {device['type'] or '':6} {device['size'] / 1024 ** 3:9.1f}G {device['fstype'] or '':12} "
+                  f"{vg or '':12} {device['mountpoint'] or ''}")
+        candidates = self.candidates(lv_name)
+        print(f"\nRecovery candidates (unmounted PVs whose VG has '{lv_name}'): {', '.join(candidates) or 'none'}")
+
+def _load_json_output(name, fixture_dir=None):
+    if fixture_dir:
+        with open(os.path.join(fixture_dir, f"{name}.json"), encoding="utf-8") as f:
+            return json.load(f)
+    completed = subprocess.run(DISCOVERY_COMMANDS[name], capture_output=True, universal_newlines=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"{' '.join(DISCOVERY_COMMANDS[name])} failed: {completed.stderr.strip()}")
+    return json.loads(completed.stdout)
+
+def discover_block_devices(fixture_dir=None):
+    """Take one snapshot of the block device stack, from the live system or recorded JSON fixtures."""
+    return BlockDeviceIndex(*(_load_json_output(name, fixture_dir) for name in ("lsblk", "pvs", "lvs")))
+
+def recovery_names(disk):
+    """Unique VG basename and mount directory for a disk, e.g. /dev/sdc2 -> cloned_sdc2."""
+    suffix = re.sub(r"[^A-Za-z0-9_]", "_", os.path.basename(disk))
+    return f"cloned_{suffix}", f"/mnt/damaged_disk_{suffix}"
+
+def recover_disk(disk, vg_name="cloned", mount_dir="/mnt/damaged_disk", lv_name="rootlv", label=None, index=None):
+    """Import, activate, repair and mount the OS volume on one cloned disk.
+
+    With a BlockDeviceIndex, the logical volume is checked against the
+    snapshot up front instead of probing /dev after activation.
+
+    Returns a result dict with the disk, VG, mount directory, final status,
+    the step that failed (if any) and per-step timings.
+    """
+    prefix = f"[{label}] " if label else ""
+    result = {"disk": disk, "vg": vg_name, "mount_dir": mount_dir, "status": "failed", "failed_step": None,
+              "steps": []}
+    started = time.perf_counter()
+    try:
+        _recover_disk_steps(disk, vg_name, mount_dir, lv_name, label, prefix, result, index)
+    finally:
+        result["total_seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+def _recover_disk_steps(disk, vg_name, mount_dir, lv_name, label, prefix, result, index):
+    """The recovery pipeline; records progress in result and stops at the first failed step."""
+    lv_path = f"/dev/{vg_name}/{lv_name}"
+    if index is not None and lv_name not in index.lv_names_for(disk):
+        print(f"\n{prefix}Error: {disk} has no logical volume '{lv_name}'. Skipping recovery.")
+        result["failed_step"] = "lv-check"
         return
-    
-    # Step 3: Import the cloned volume group and rename it to 'cloned'
-    print(f"\nRunning vgimportclone on {disk}...")
-    vg_import_result = run_command(f"sudo vgimportclone --basevgname cloned {disk}")
-    
-    if "Failed to find device" in vg_import_result:
-        print(f"\nError: Device {disk} was not found.")
+    # Import the cloned volume group under a new name so it doesn't clash with the running OS
+    print(f"\n{prefix}Running vgimportclone on {disk}...")
+    vg_import_result = _timed_step(result, "vgimportclone", ["sudo", "vgimportclone", "--basevgname", vg_name, disk],
+                                   label)
+    if not vg_import_result.ok or "Failed to find device" in vg_import_result.output:
+        print(f"\n{prefix}Error: Device {disk} was not found.")
+        result["failed_step"] = "vgimportclone"
         return
 
-    # Step 4: Activate the cloned volume group
-    print("\nActivating cloned volume group...")
-    vg_change_result = run_command("sudo vgchange -ay cloned")
-    
-    if "Volume group \"cloned\" not found" in vg_change_result:
-        print("\nError: Cloned volume group not found. Skipping further steps.")
+    # Activate the cloned volume group
+    print(f"\n{prefix}Activating {vg_name} volume group...")
+    vg_change_result = _timed_step(result, "vgchange", ["sudo", "vgchange", "-ay", vg_name], label)
+    if not vg_change_result.ok or f"Volume group \"{vg_name}\" not found" in vg_change_result.output:
+        print(f"\n{prefix}Error: {vg_name} volume group not found. Skipping further steps.")
+        result["failed_step"] = "vgchange"
         return
-    
-    # Step 5: Create mount directory if it doesn't already exist
-    mount_dir = "/mnt/damaged_disk"
+
+    # Create mount directory if it doesn't already exist
     if not os.path.exists(mount_dir):
-        print(f"\nCreating mount directory {mount_dir}...")
-        run_command(f"sudo mkdir {mount_dir}")
+        print(f"\n{prefix}Creating mount directory {mount_dir}...")
+        _timed_step(result, "mkdir", ["sudo", "mkdir", "-p", mount_dir], label)
     else:
-        print(f"\nMount directory {mount_dir} already exists, skipping this step.")
-    
-    # Step 6: Check if the logical volume exists before repairing
-    lv_path = "/dev/cloned/rootlv"
-    if not os.path.exists(lv_path):
-        print(f"\nError: Logical volume {lv_path} does not exist. Skipping xfs_repair and mount steps.")
+        print(f"\n{prefix}Mount directory {mount_dir} already exists, skipping this step.")
+
+    # Check if the logical volume exists before repairing (already known from the snapshot, if any)
+    if index is None and not os.path.exists(lv_path):
+        print(f"\n{prefix}Error: Logical volume {lv_path} does not exist. Skipping xfs_repair and mount steps.")
+        result["failed_step"] = "lv-check"
         return
-    
-    # Step 7: Repair the filesystem
-    print(f"\nRunning xfs_repair on {lv_path}...")
-    run_command(f"sudo xfs_repair {lv_path}")
-    
-    # Step 8: Mount the repaired logical volume
-    print(f"\nMounting the repaired logical volume at {mount_dir}...")
-    mount_result = run_command(f"sudo mount -o nouuid {lv_path} {mount_dir}")
-    
-    if "special device" in mount_result:
-        print("\nError: Failed to mount the logical volume. Check if the logical volume exists.")
+
+    # Repair the filesystem
+    print(f"\n{prefix}Running xfs_repair on {lv_path}...")
+    phases = XfsRepairPhases(label)
+    repair_result = _timed_step(result, "xfs_repair", ["sudo", "xfs_repair", "-t", str(XFS_PROGRESS_INTERVAL), lv_path],
+                                label, phases)
+    result["steps"][-1]["phases"] = phases.finish()
+    if not repair_result.ok:
+        result["failed_step"] = "xfs_repair"
         return
-    
-    # Step 9: Inform the user that the process is complete
-    print(f"\nDisk mounted successfully. You can now access the filesystem at {mount_dir}.")
-    
+
+    # Mount the repaired logical volume
+    print(f"\n{prefix}Mounting the repaired logical volume at {mount_dir}...")
+    mount_result = _timed_step(result, "mount", ["sudo", "mount", "-o", "nouuid", lv_path, mount_dir], label)
+    if not mount_result.ok or "special device" in mount_result.output:
+        print(f"\n{prefix}Error: Failed to mount the logical volume. Check if the logical volume exists.")
+        result["failed_step"] = "mount"
+        return
+
+    result["status"] = "mounted"
+    print(f"\n{prefix}Disk mounted successfully. You can now access the filesystem at {mount_dir}.")
+
+def recover_disks(disks, jobs=DEFAULT_JOBS, lv_name="rootlv", index=None):
+    """Recover several disks concurrently, each with its own VG name and mountpoint."""
+    def recover(disk):
+        vg_name, mount_dir = recovery_names(disk)
+        return recover_disk(disk, vg_name, mount_dir, lv_name, label=os.path.basename(disk), index=index)
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        results = list(executor.map(recover, disks))
+
+    print("\nRecovery report:")
+    for result in results:
+        detail = f"mounted at {result['mount_dir']}" if result["status"] == "mounted" else f"failed at {result['failed_step']}"
+        print(f"  {result['disk']:12} VG {result['vg']:18} {result['total_seconds']:8.1f}s  {detail}")
+    return results
+
+def write_timing_report(results, report_path):
+    """Write per-disk, per-step (and per xfs_repair phase) timings as JSON."""
+    report = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "host": os.uname().nodename,
+        "disks": results,
+    }
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nTiming report written to {report_path}")
+
+def print_step_timings(result):
+    print(f"\nStep timings for {result['disk']}:")
+    for step in result["steps"]:
+        print(f"  {step['step']:14} {step['seconds']:10.1f}s  (exit {step['returncode']})")
+        for phase in step.get("phases", []):
+            print(f"    phase {phase['phase']}: {phase['description']:45.45} {phase['seconds']:10.1f}s")
+    print(f"  {'total':14} {result['total_seconds']:10.1f}s")
+
+def normalize_disk(disk):
+    # Ensure the user input includes /dev/ prefix
+    return disk if disk.startswith("/dev/") else f"/dev/{disk}"
+
+def main(report_path, lv_name="rootlv", index=None):
+    # Step 1: Display available disks and the likely recovery candidates
+    print("Listing all block devices:\n")
+    if index is not None:
+        index.print_summary(lv_name)
+        candidates = index.candidates(lv_name)
+    else:
+        run_command(["lsblk"])
+        candidates = []
+
+    # Step 2: Ask the user for the disk (e.g., /dev/sdX), defaulting to the only candidate
+    default = candidates[0] if len(candidates) == 1 else None
+    hint = f"[{default}]" if default else "(e.g., /dev/sdc2)"
+    disk = input(f"Enter the disk on which to run the recovery operation {hint}: ").strip() or default
+    if not disk:
+        print("No disk selected.")
+        return
+    disk = normalize_disk(disk)
+
+    # Confirm the user's choice
+    confirm = input(f"You have selected {disk}. Do you want to continue? (yes/no): ").lower()
+    if confirm != 'yes':
+        print("Operation cancelled by the user.")
+        return
+
+    # Steps 3-9: import as 'cloned', activate, repair and mount at /mnt/damaged_disk
+    result = recover_disk(disk, lv_name=lv_name, index=index)
+    print_step_timings(result)
+    write_timing_report([result], report_path)
+
+def batch_main(disks, jobs, lv_name, report_path, assume_yes=False, index=None):
+    disks = [normalize_disk(disk) for disk in disks]
+    print("The following disks will be recovered:")
+    for disk in disks:
+        vg_name, mount_dir = recovery_names(disk)
+        print(f"  {disk} -> VG {vg_name}, mounted at {mount_dir}")
+    if not assume_yes:
+        confirm = input("Do you want to continue? (yes/no): ").lower()
+        if confirm != 'yes':
+            print("Operation cancelled by the user.")
+            return
+    results = recover_disks(disks, jobs, lv_name, index)
+    for result in results:
+        print_step_timings(result)
+    write_timing_report(results, report_path)
+
+def cli(argv=None, prog=None):
+    """Command-line entry point; argv defaults to sys.argv[1:]."""
+    parser = argparse.ArgumentParser(prog=prog, description="Recover LVM-based OS disks attached to a rescue VM.")
+    parser.add_argument("disks", nargs="*",
+                        help="Devices to recover in batch (e.g. /dev/sdc2 /dev/sdd2); omit for interactive mode")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS,
+                        help=f"Disks recovered concurrently in batch mode (default: {DEFAULT_JOBS})")
+    parser.add_argument("--lv-name", default="rootlv", help="Logical volume to repair and mount (default: rootlv)")
+    parser.add_argument("--yes", action="store_true", help="Don't ask for confirmation in batch mode")
+    parser.add_argument("--report", default=f"lvm-recovery-{time.strftime('%Y%m%d-%H%M%S')}.json",
+                        help="Where to write the JSON timing report (default: ./lvm-recovery-<timestamp>.json)")
+    parser.add_argument("--auto", action="store_true",
+                        help="Recover every candidate found by discovery (unmounted PVs whose VG has --lv-name)")
+    parser.add_argument("--discover", action="store_true", help="Only print the discovered devices and candidates")
+    parser.add_argument("--fixture", metavar="DIR",
+                        help="Read recorded lsblk.json/pvs.json/lvs.json from DIR instead of probing disks")
+    args = parser.parse_args(argv)
+
+    try:
+        index = discover_block_devices(args.fixture)
+    except (OSError, RuntimeError, ValueError) as e:
+        # Older util-linux/LVM without JSON output: fall back to probing /dev as before
+        print(f"Block device discovery unavailable ({e}); falling back to direct checks.")
+        index = None
+
+    if args.discover:
+        if index is not None:
+            index.print_summary(args.lv_name)
+    elif args.auto:
+        disks = index.candidates(args.lv_name) if index is not None else []
+        if disks:
+            batch_main(disks, args.jobs, args.lv_name, args.report, args.yes, index)
+        else:
+            print("No recovery candidates found.")
+    elif args.disks:
+        batch_main(args.disks, args.jobs, args.lv_name, args.report, args.yes, index)
+    else:
+        main(args.report, args.lv_name, index)
+
 if __name__ == "__main__":
-    main()
+    cli()
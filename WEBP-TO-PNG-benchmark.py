@@ -0,0 +1,114 @@
+import argparse
+import importlib.util
+import json
+import multiprocessing
+import os
+import resource
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+# WEBP-TO-PNG.py can't be imported by name because of the dashes.
+_spec = importlib.util.spec_from_file_location(
+    "webp_to_png", os.path.join(os.path.dirname(os.path.abspath(__file__)), "WEBP-TO-PNG.py"))
+webp_to_png = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(webp_to_png)
+
+def _synthetic_image(width, height, mode):
+    """A photo-like test image: smooth gradients plus noise, so it neither compresses trivially nor not at all."""
+    gradient = Image.linear_gradient('L').resize((width, height))
+    noise = Image.effect_noise((width, height), 24)
+    channels = [gradient, noise, Image.blend(gradient, noise, 0.5)]
+    if mode == 'RGBA':
+        channels.append(gradient.transpose(Image.Transpose.ROTATE_90).resize((width, height)))
+    return Image.merge(mode, channels)
+
+def generate_corpus(directory, count=8, size=1024, large_size=8000):
+    """Write a mixed WebP corpus and return {kind: [paths]}.
+
+    Kinds: lossy, lossless, alpha (lossless RGBA) and large (one lossy image
+    of large_size x large_size).
+    """
+    specs = {
+        'lossy': ('RGB', {'quality': 80}, size, count),
+        'lossless': ('RGB', {'lossless': True}, size, count),
+        'alpha': ('RGBA', {'lossless': True}, size, count),
+        'large': ('RGB', {'quality': 80}, large_size, 1),
+    }
+    corpus = {}
+    for kind, (mode, options, dimension, n) in specs.items():
+        corpus[kind] = []
+        for i in range(n):
+            path = os.path.join(directory, f"{kind}-{i}.webp")
+            _synthetic_image(dimension, dimension, mode).save(path, 'WEBP', **options)
+            corpus[kind].append(path)
+    return corpus
+
+def _run_profile(profile, corpus, output_dir):
+    """Encode the whole corpus with one profile. Runs in a fresh process so peak RSS is per profile."""
+    results = {}
+    for kind, paths in corpus.items():
+        encode_seconds = 0.0
+        output_bytes = 0
+        for path in paths:
+            png_file = os.path.join(output_dir, f"{profile}-{os.path.basename(path)}.png")
+            with Image.open(path) as img:
+                img.load()  # decode outside the timed section
+                started = time.perf_counter()
+                webp_to_png.save_png(img, png_file, profile)
+                encode_seconds += time.perf_counter() - started
+            output_bytes += os.path.getsize(png_file)
+            os.remove(png_file)
+        results[kind] = {
+            'images': len(paths),
+            'encode_ms_per_image': encode_seconds * 1000 / len(paths),
+            'output_bytes': output_bytes,
+        }
+    # ru_maxrss is reported in KiB on Linux
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return results, peak_rss_mb
+
+def run_benchmark(corpus, output_dir, profiles=None):
+    """Benchmark every profile over the corpus; returns {profile: {...}}."""
+    report = {}
+    for profile in profiles or webp_to_png.PROFILES:
+        # Spawn rather than fork so the child doesn't inherit the corpus generator's peak RSS.
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+            results, peak_rss_mb = executor.submit(_run_profile, profile, corpus, output_dir).result()
+        report[profile] = {'peak_rss_mb': peak_rss_mb, 'kinds': results}
+    return report
+
+def print_report(report, corpus):
+    input_bytes = {kind: sum(os.path.getsize(p) for p in paths) for kind, paths in corpus.items()}
+    print(f"{'profile':10} {'kind':9} {'images':>6} {'encode ms/img':>14} {'output bytes':>14} {'vs webp':>8} {'peak RSS':>9}")
+    for profile, data in report.items():
+        for kind, stats in data['kinds'].items():
+            ratio = stats['output_bytes'] / input_bytes[kind] if input_bytes[kind] else 0
+            print(f"{profile:10} {kind:9} {stats['images']:6} {stats['encode_ms_per_image']:14.1f} "
+                  f"{stats['output_bytes']:14} {ratio:7.1f}x {data['peak_rss_mb']:7.0f}MB")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark WEBP-TO-PNG.py encoder profiles on a generated corpus.")
+    parser.add_argument("--count", type=int, default=8, help="Images per kind (default: 8)")
+    parser.add_argument("--size", type=int, default=1024, help="Edge length of regular images in pixels (default: 1024)")
+    parser.add_argument("--large-size", type=int, default=8000,
+                        help="Edge length of the very large image in pixels (default: 8000)")
+    parser.add_argument("--profiles", help="Comma-separated profiles to run (default: all)")
+    parser.add_argument("--json", metavar="FILE", help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="webp-bench-")
+    try:
+        print(f"Generating corpus in {work_dir}...")
+        corpus = generate_corpus(work_dir, args.count, args.size, args.large_size)
+        profiles = args.profiles.split(",") if args.profiles else None
+        report = run_benchmark(corpus, work_dir, profiles)
+        print_report(report, corpus)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+    finally:
+        shutil.rmtree(work_dir)
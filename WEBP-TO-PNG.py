@@ -1,17 +1,528 @@
-from tkinter import Tk, filedialog, messagebox
-from PIL import Image
+import argparse
+import bisect
+import hashlib
+import json
 import os
+import queue
+import socket
+import struct
+import tempfile
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
 
-def convert_webp_to_png(webp_file):
-    png_file = os.path.splitext(webp_file)[0] + '.png'  # Change the file extension to .png
+MANIFEST_NAME = ".webp-to-png-manifest.json"
+# Save the manifest every this many conversions so an interrupted run keeps its progress.
+MANIFEST_SAVE_EVERY = 500
+
+# PNG encoder settings trading CPU time for output size. "balanced" is Pillow's default.
+PROFILES = {
+    'fast': {'compress_level': 1},
+    'balanced': {'compress_level': 6},
+    'smallest': {'compress_level': 9, 'optimize': True},
+}
+DEFAULT_PROFILE = 'balanced'
+
+MIB = 1024 * 1024
+
+DEFAULT_SOCKET = os.path.join(os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir(), 'webp-to-png.sock')
+# Seconds a client waits for the daemon's answer before giving up
+DEFAULT_CLIENT_TIMEOUT = 600
+
+ConversionResult = namedtuple('ConversionResult', 'webp_file png_file input_bytes error digest converted')
+
+def png_path_for(webp_file):
+    return os.path.splitext(webp_file)[0] + '.png'  # Change the file extension to .png
+
+def save_png(img, png_file, profile=DEFAULT_PROFILE):
+    img.save(png_file, 'PNG', **PROFILES[profile])
+
+def convert_webp_to_png(webp_file, profile=DEFAULT_PROFILE, thumbnail=None):
+    # PIL is imported on first use so the daemon client and --help start without it.
+    from PIL import Image
+
+    png_file = png_path_for(webp_file)
     with Image.open(webp_file) as img:
-        img.save(png_file, 'PNG')
+        if thumbnail:
+            # draft() scales during decode for codecs that support it. Pillow's WebP
+            # decoder doesn't, so the full bitmap is decoded once and reduced right
+            # away, releasing it before the (slower) PNG encode starts.
+            img.draft(img.mode, thumbnail)
+            img.thumbnail(thumbnail, reducing_gap=2.0)
+        save_png(img, png_file, profile)
     return png_file
 
+def estimate_decoded_bytes(webp_file):
+    """Size of the decoded bitmap, read from the WebP header without decoding pixels."""
+    from PIL import Image
+
+    with Image.open(webp_file) as img:
+        return img.width * img.height * len(img.getbands())
+
+def file_digest(path):
+    """BLAKE2b content hash of a file, read in 1 MiB chunks."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def find_webp_files(paths):
+    """Yield every .webp file under the given files and directories."""
+    for path in paths:
+        if os.path.isfile(path):
+            if path.lower().endswith('.webp'):
+                yield path
+            continue
+        for root, _, files in os.walk(path):
+            for name in files:
+                if name.lower().endswith('.webp'):
+                    yield os.path.join(root, name)
+
+def _convert_one(webp_file, known_digest=None, track=False, profile=DEFAULT_PROFILE, thumbnail=None):
+    """Worker wrapper: convert a file and report the outcome instead of raising.
+
+    With track, the content hash is returned for the manifest. If it matches
+    known_digest and the PNG exists (e.g. the file was only touched), the
+    conversion is skipped.
+    """
+    try:
+        size = os.path.getsize(webp_file)
+        digest = file_digest(webp_file) if track else None
+        if digest and digest == known_digest and os.path.exists(png_path_for(webp_file)):
+            return ConversionResult(webp_file, png_path_for(webp_file), size, None, digest, False)
+        png_file = convert_webp_to_png(webp_file, profile, thumbnail)
+        return ConversionResult(webp_file, png_file, size, None, digest, True)
+    except Exception as e:
+        return ConversionResult(webp_file, None, 0, str(e), None, False)
+
+def load_manifest(manifest_path):
+    try:
+        with open(manifest_path, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_manifest(manifest_path, manifest):
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, manifest_path)
+
+def _same_settings(entry, profile, thumbnail):
+    """True if a manifest entry's PNG was written with this profile and thumbnail size."""
+    return (entry.get('profile', DEFAULT_PROFILE) == profile
+            and entry.get('thumbnail') == (list(thumbnail) if thumbnail else None))
+
+def is_up_to_date(webp_file, manifest, profile=DEFAULT_PROFILE, thumbnail=None):
+    """True if the manifest entry matches the file's mtime, size and settings and the PNG exists.
+
+    This only costs two stat calls, so a converged tree is scanned without
+    decoding or hashing anything.
+    """
+    entry = manifest.get(os.path.abspath(webp_file))
+    if not entry:
+        return False
+    st = os.stat(webp_file)
+    return (entry['mtime_ns'] == st.st_mtime_ns and entry['size'] == st.st_size
+            and _same_settings(entry, profile, thumbnail)
+            and os.path.exists(png_path_for(webp_file)))
+
+def _record(manifest, result, profile=DEFAULT_PROFILE, thumbnail=None):
+    st = os.stat(result.webp_file)
+    manifest[os.path.abspath(result.webp_file)] = {
+        'mtime_ns': st.st_mtime_ns,
+        'size': st.st_size,
+        'hash': result.digest,
+        'profile': profile,
+        'thumbnail': list(thumbnail) if thumbnail else None,
+    }
+
+def _map_memory_bounded(pool, convert, webp_files, known_digests, budget, workers):
+    """Like pool.map, but only keeps jobs running while their decoded size fits in budget.
+
+    Each file's decoded size is estimated from its header. Whenever a worker
+    frees up, the largest waiting image that fits in the remaining budget is
+    started (best fit), so huge images run with fewer neighbours and small
+    ones fill the gaps. Images that couldn't fit even on their own fail
+    instead of pushing the host into OOM. Results are yielded as they finish.
+    """
+    waiting = []  # sorted (estimate, index) pairs
+    for index, webp_file in enumerate(webp_files):
+        try:
+            estimate = estimate_decoded_bytes(webp_file)
+        except Exception as e:
+            yield ConversionResult(webp_file, None, 0, str(e), None, False)
+            continue
+        if estimate > budget:
+            yield ConversionResult(webp_file, None, 0, f"needs ~{estimate / MIB:.0f} MiB decoded, "
+                                   f"over the {budget / MIB:.0f} MiB budget", None, False)
+            continue
+        waiting.append((estimate, index))
+    waiting.sort()
+
+    running = {}
+    in_use = 0
+    while waiting or running:
+        while waiting and len(running) < workers:
+            pos = bisect.bisect_right(waiting, (budget - in_use, len(webp_files))) - 1
+            if pos < 0:
+                break
+            estimate, index = waiting.pop(pos)
+            future = pool.submit(convert, webp_files[index], known_digests[index])
+            running[future] = estimate
+            in_use += estimate
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            in_use -= running.pop(future)
+            yield future.result()
+
+def convert_files(webp_files, workers=None, manifest=None, manifest_path=None, executor=None,
+                  profile=DEFAULT_PROFILE, thumbnail=None, worker_memory=None):
+    """Convert webp_files in a process pool, skipping up-to-date files when a manifest is given.
+
+    With worker_memory (bytes of decoded pixels per worker), jobs are
+    scheduled against a budget of worker_memory * workers instead of being
+    handed out blindly. Returns a list of ConversionResult and prints
+    images/sec and MB/sec.
+    """
+    if manifest is not None:
+        total = len(webp_files)
+        webp_files = [f for f in webp_files if not is_up_to_date(f, manifest, profile, thumbnail)]
+        print(f"{total - len(webp_files)} file(s) up to date, {len(webp_files)} to check.")
+    if not webp_files:
+        return []
+
+    workers = workers or os.cpu_count() or 1
+    print(f"Converting {len(webp_files)} file(s) with {workers} worker(s)...")
+    known_digests = []
+    for webp_file in webp_files:
+        entry = manifest.get(os.path.abspath(webp_file)) if manifest is not None else None
+        # A content match only counts if the PNG was written with the same settings.
+        same_settings = entry and _same_settings(entry, profile, thumbnail)
+        known_digests.append(entry['hash'] if same_settings else None)
+    results = []
+    started = time.perf_counter()
+    # Hand files to workers in chunks to keep IPC overhead low on large trees.
+    chunksize = max(1, min(64, len(webp_files) // (workers * 4)))
+    pool = executor or ProcessPoolExecutor(max_workers=workers)
+    try:
+        convert = partial(_convert_one, track=manifest is not None, profile=profile, thumbnail=thumbnail)
+        if worker_memory:
+            outcomes = _map_memory_bounded(pool, convert, webp_files, known_digests, worker_memory * workers, workers)
+        else:
+            outcomes = pool.map(convert, webp_files, known_digests, chunksize=chunksize)
+        for result in outcomes:
+            results.append(result)
+            if result.error:
+                print(f"Failed to convert {result.webp_file}: {result.error}")
+            elif manifest is not None:
+                _record(manifest, result, profile, thumbnail)
+                if manifest_path and len(results) % MANIFEST_SAVE_EVERY == 0:
+                    save_manifest(manifest_path, manifest)
+    finally:
+        if executor is None:
+            pool.shutdown()
+    elapsed = time.perf_counter() - started
+
+    if manifest is not None and manifest_path:
+        save_manifest(manifest_path, manifest)
+
+    converted = [r for r in results if r.converted]
+    unchanged = sum(1 for r in results if r.error is None and not r.converted)
+    megabytes = sum(r.input_bytes for r in converted) / (1024 * 1024)
+    print(f"\nConverted {len(converted)} of {len(results)} file(s) in {elapsed:.2f}s"
+          + (f" ({unchanged} unchanged by content)" if unchanged else ""))
+    if elapsed > 0:
+        print(f"Throughput: {len(converted) / elapsed:.1f} images/sec, {megabytes / elapsed:.2f} MB/sec (WebP input)")
+    return results
+
+def convert_batch(paths, workers=None, manifest_path=None, profile=DEFAULT_PROFILE, thumbnail=None,
+                  worker_memory=None):
+    """Convert every WebP file under paths in a process pool sized to the CPU count.
+
+    With manifest_path, files whose mtime, size (or, failing that, content
+    hash) match the previous run are skipped.
+    """
+    webp_files = list(find_webp_files(paths))
+    if not webp_files:
+        print("No WebP files found.")
+        return []
+    manifest = load_manifest(manifest_path) if manifest_path else None
+    return convert_files(webp_files, workers, manifest, manifest_path, profile=profile, thumbnail=thumbnail,
+                         worker_memory=worker_memory)
+
+# inotify constants from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_ISDIR = 0x40000000
+_INOTIFY_EVENT = struct.Struct('iIII')
+
+def watch(paths, workers=None, manifest_path=None, profile=DEFAULT_PROFILE, thumbnail=None, worker_memory=None):
+    """Convert new or changed .webp files under the given directories as they land.
+
+    Uses Linux inotify directly (through ctypes) so no extra package is needed.
+    Runs an incremental pass first, then blocks until interrupted.
+    """
+    import ctypes
+    import ctypes.util
+
+    libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+    fd = libc.inotify_init1(0)
+    if fd < 0:
+        raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+    watches = {}
+
+    def add_watch(directory):
+        wd = libc.inotify_add_watch(fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE)
+        if wd < 0:
+            print(f"Cannot watch {directory}: {os.strerror(ctypes.get_errno())}")
+        else:
+            watches[wd] = directory
+
+    directories = [p for p in paths if os.path.isdir(p)]
+    for directory in directories:
+        for root, _, _ in os.walk(directory):
+            add_watch(root)
+
+    manifest_path = manifest_path or MANIFEST_NAME
+    manifest = load_manifest(manifest_path)
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        convert_files(list(find_webp_files(directories)), workers, manifest, manifest_path, executor, profile,
+                      thumbnail, worker_memory)
+        print(f"\nWatching {len(watches)} director(y/ies) for WebP files. Press Ctrl+C to stop.")
+        try:
+            while True:
+                data = os.read(fd, 64 * 1024)
+                pending = set()
+                offset = 0
+                while offset < len(data):
+                    wd, mask, _, name_len = _INOTIFY_EVENT.unpack_from(data, offset)
+                    offset += _INOTIFY_EVENT.size
+                    name = os.fsdecode(data[offset:offset + name_len].rstrip(b'\0'))
+                    offset += name_len
+                    path = os.path.join(watches.get(wd, ''), name)
+                    if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                        # New subdirectory: watch it and pick up anything already inside.
+                        for root, _, _ in os.walk(path):
+                            add_watch(root)
+                        pending.update(find_webp_files([path]))
+                    elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO) and name.lower().endswith('.webp'):
+                        pending.add(path)
+                pending = [p for p in pending if os.path.exists(p)]
+                if pending:
+                    convert_files(pending, workers, manifest, manifest_path, executor, profile, thumbnail,
+                                  worker_memory)
+        except KeyboardInterrupt:
+            print("\nStopped watching.")
+        finally:
+            os.close(fd)
+
+def _warm_up():
+    """Import PIL and register its plugins so a worker's first real job doesn't pay for it."""
+    from PIL import Image
+    Image.init()
+
+def _convert_chunk(webp_files, profile, thumbnail):
+    return [_convert_one(webp_file, profile=profile, thumbnail=thumbnail) for webp_file in webp_files]
+
+class ConversionDaemon:
+    """Keeps a warm worker pool and batches queued conversion jobs onto it.
+
+    Jobs from every client land on one queue. A dispatcher thread drains
+    whatever is queued, groups it by settings and hands each worker one
+    chunk, so a burst of single-file requests costs a few IPC round trips
+    rather than one per file. If a worker dies (e.g. OOM-killed), the
+    broken pool is replaced by a fresh, warmed-up one.
+    """
+
+    def __init__(self, workers=None, batch_size=256):
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.pool = self._start_pool()
+        self.restarts = 0
+        self.jobs = queue.Queue()
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.latencies = deque(maxlen=10000)
+        self.started = time.monotonic()
+        threading.Thread(target=self._dispatch, daemon=True).start()
+
+    def _start_pool(self):
+        pool = ProcessPoolExecutor(max_workers=self.workers)
+        for _ in range(self.workers):
+            pool.submit(_warm_up)
+        return pool
+
+    def _restart_pool(self):
+        print("Worker pool is broken (a worker died); starting a new one.")
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self.pool = self._start_pool()
+        with self.lock:
+            self.restarts += 1
+
+    def _submit_chunk(self, chunk, profile, thumbnail):
+        with self.lock:
+            self.in_flight += len(chunk)
+        files = [job[1] for job in chunk]
+        try:
+            try:
+                task = self.pool.submit(_convert_chunk, files, profile, thumbnail)
+            except BrokenProcessPool:
+                # The chunk never ran, so it gets one try on the replacement pool
+                self._restart_pool()
+                task = self.pool.submit(_convert_chunk, files, profile, thumbnail)
+        except Exception as e:
+            task = Future()
+            task.set_exception(e)
+        task.add_done_callback(partial(self._finish, chunk))
+
+    def submit(self, webp_file, profile=DEFAULT_PROFILE, thumbnail=None):
+        """Queue a conversion; returns a Future resolving to a ConversionResult."""
+        future = Future()
+        self.jobs.put((time.perf_counter(), webp_file, profile, thumbnail, future))
+        return future
+
+    def _dispatch(self):
+        while True:
+            batch = [self.jobs.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.jobs.get_nowait())
+                except queue.Empty:
+                    break
+            groups = {}
+            for job in batch:
+                groups.setdefault((job[2], job[3]), []).append(job)
+            for (profile, thumbnail), jobs in groups.items():
+                chunk_count = min(self.workers, len(jobs))
+                for i in range(chunk_count):
+                    self._submit_chunk(jobs[i::chunk_count], profile, thumbnail)
+
+    def _finish(self, chunk, task):
+        try:
+            results = task.result()
+        except Exception as e:
+            results = [ConversionResult(job[1], None, 0, str(e), None, False) for job in chunk]
+        finished = time.perf_counter()
+        with self.lock:
+            self.in_flight -= len(chunk)
+            for job, result in zip(chunk, results):
+                self.latencies.append(finished - job[0])
+                if result.error:
+                    self.failed += 1
+                else:
+                    self.completed += 1
+        for job, result in zip(chunk, results):
+            job[4].set_result(result)
+
+    def metrics(self):
+        with self.lock:
+            latencies = sorted(self.latencies)
+            metrics = {
+                'queue_depth': self.jobs.qsize(),
+                'in_flight': self.in_flight,
+                'completed': self.completed,
+                'failed': self.failed,
+                'workers': self.workers,
+                'pool_restarts': self.restarts,
+                'uptime_s': round(time.monotonic() - self.started, 1),
+            }
+        if latencies:
+            metrics['latency_ms'] = {
+                'p50': round(latencies[len(latencies) // 2] * 1000, 2),
+                'p99': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 2),
+                'max': round(latencies[-1] * 1000, 2),
+            }
+        return metrics
+
+    def shutdown(self):
+        self.pool.shutdown(cancel_futures=True)
+
+def serve(socket_path=DEFAULT_SOCKET, workers=None, profile=DEFAULT_PROFILE, thumbnail=None):
+    """Run the conversion daemon on a UNIX socket until interrupted.
+
+    Protocol: one JSON object per line. {"files": [...]} (optionally with
+    "profile" and "thumbnail") converts files and answers with their
+    results; {"metrics": true} answers with queue depth and latency stats.
+    """
+    import signal
+    import socketserver
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    daemon = ConversionDaemon(workers)
+    # Service managers stop daemons with SIGTERM; clean up the same way as Ctrl+C.
+    # Installed after the pool has forked so workers keep the default handler.
+    signal.signal(signal.SIGTERM, stop)
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                try:
+                    request = json.loads(line)
+                    if request.get('metrics'):
+                        response = daemon.metrics()
+                    else:
+                        job_thumbnail = request.get('thumbnail', thumbnail)
+                        futures = [
+                            daemon.submit(webp_file, request.get('profile', profile),
+                                          tuple(job_thumbnail) if job_thumbnail else None)
+                            for webp_file in request['files']
+                        ]
+                        response = {'results': [
+                            {'webp_file': r.webp_file, 'png_file': r.png_file, 'error': r.error}
+                            for r in (f.result() for f in futures)
+                        ]}
+                except (ValueError, KeyError, TypeError) as e:
+                    response = {'error': f"bad request: {e}"}
+                self.wfile.write(json.dumps(response).encode() + b'\n')
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    old_umask = os.umask(0o177)  # socket is only usable by its owner
+    try:
+        server = socketserver.ThreadingUnixStreamServer(socket_path, Handler)
+    finally:
+        os.umask(old_umask)
+    server.daemon_threads = True
+    print(f"Conversion daemon listening on {socket_path} with {daemon.workers} worker(s). Press Ctrl+C to stop.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping daemon.")
+    finally:
+        server.server_close()
+        daemon.shutdown()
+        os.remove(socket_path)
+
+def send_request(request, socket_path=DEFAULT_SOCKET, timeout=DEFAULT_CLIENT_TIMEOUT):
+    """Send one request to a running daemon and return its decoded response.
+
+    Raises socket.timeout if the daemon doesn't answer within timeout seconds.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(socket_path)
+        client.sendall(json.dumps(request).encode() + b'\n')
+        with client.makefile('rb') as reader:
+            return json.loads(reader.readline())
+
 def select_file():
+    # Imported here so headless batch runs don't need Tk or a display.
+    from tkinter import Tk, filedialog, messagebox
+
     Tk().withdraw()  # Hide the root window
     webp_file = filedialog.askopenfilename(title="Select a WebP file", filetypes=[("WebP files", "*.webp")])
-    
+
     if webp_file:
         try:
             png_file = convert_webp_to_png(webp_file)
@@ -21,6 +532,75 @@ def select_file():
     else:
         messagebox.showwarning("No Selection", "No file was selected.")
 
-# Run the file selection dialog
+# Run the file selection dialog, or batch-convert the paths given on the command line
+def cli(argv=None, prog=None):
+    """Command-line entry point; argv defaults to sys.argv[1:]."""
+    parser = argparse.ArgumentParser(prog=prog, description="Convert WebP images to PNG.")
+    parser.add_argument("paths", nargs="*",
+                        help="Files or directories to convert headlessly (default: open a file dialog)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Conversion processes for batch mode (default: number of CPU cores)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Skip files already converted, tracked by mtime/size/hash in --manifest")
+    parser.add_argument("--watch", action="store_true",
+                        help="After an incremental pass, keep converting new or changed files (Linux inotify)")
+    parser.add_argument("--manifest", default=MANIFEST_NAME,
+                        help=f"Manifest file for --incremental/--watch (default: ./{MANIFEST_NAME})")
+    parser.add_argument("--profile", choices=sorted(PROFILES),
+                        help=f"PNG encoder profile (default: {DEFAULT_PROFILE}; with --client, the daemon's)")
+    parser.add_argument("--worker-memory", type=float, metavar="MIB",
+                        help="Decoded pixel memory budget for the pool, given per worker (total budget = "
+                             "MIB x workers); jobs are scheduled by size estimated from the WebP header, so one "
+                             "large image may use up to the whole budget, and images larger than it are rejected")
+    parser.add_argument("--thumbnail", metavar="WxH",
+                        help="Write PNGs downscaled to fit within WxH (e.g. 512x512; with --client, "
+                             "default: the daemon's)")
+    parser.add_argument("--serve", action="store_true",
+                        help="Run a conversion daemon that keeps PIL and the worker pool warm")
+    parser.add_argument("--client", action="store_true",
+                        help="Send the given files to a running daemon instead of converting them here")
+    parser.add_argument("--metrics", action="store_true", help="Print a running daemon's queue and latency metrics")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help=f"Daemon socket path (default: {DEFAULT_SOCKET})")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_CLIENT_TIMEOUT,
+                        help=f"With --client/--metrics, seconds to wait for the daemon (default: {DEFAULT_CLIENT_TIMEOUT})")
+    args = parser.parse_args(argv)
+
+    thumbnail = tuple(int(n) for n in args.thumbnail.lower().split("x")) if args.thumbnail else None
+    worker_memory = int(args.worker_memory * MIB) if args.worker_memory else None
+    profile = args.profile or DEFAULT_PROFILE
+    if args.serve:
+        serve(args.socket, args.workers, profile, thumbnail)
+    elif args.metrics:
+        try:
+            print(json.dumps(send_request({'metrics': True}, args.socket, args.timeout), indent=2))
+        except OSError as e:
+            print(f"Daemon did not answer: {e}")
+    elif args.client:
+        request = {'files': [os.path.abspath(f) for f in find_webp_files(args.paths)]}
+        # Only send settings given on the command line, so the daemon's --profile/--thumbnail apply otherwise
+        if args.profile:
+            request['profile'] = args.profile
+        if thumbnail:
+            request['thumbnail'] = thumbnail
+        try:
+            response = send_request(request, args.socket, args.timeout)
+        except OSError as e:  # includes socket.timeout
+            print(f"Daemon did not answer: {e}")
+            return
+        if 'error' in response:
+            print(f"Daemon error: {response['error']}")
+        for result in response.get('results', []):
+            if result['error']:
+                print(f"Failed to convert {result['webp_file']}: {result['error']}")
+            else:
+                print(f"Converted to: {result['png_file']}")
+    elif args.watch:
+        watch(args.paths or [os.getcwd()], args.workers, args.manifest, profile, thumbnail, worker_memory)
+    elif args.paths:
+        convert_batch(args.paths, args.workers, args.manifest if args.incremental else None, profile,
+                      thumbnail, worker_memory)
+    else:
+        select_file()
+
 if __name__ == "__main__":
-    select_file()
+    cli()
@@ -1,29 +1,194 @@
+import argparse
+import bisect
+import csv
+import os
+import random
+import shlex
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import requests
+from requests.adapters import HTTPAdapter
 
 # Cloudflare API credentials
 ZONE_ID = '61b10f34c3310f625882d330cc01f72c'
 
 # Cloudflare API endpoint
-API_URL = f'https://api.cloudflare.com/client/v4/zones/{ZONE_ID}/dns_records'
+API_BASE = 'https://api.cloudflare.com/client/v4'
+
+# Records requested per page when listing a zone
+PER_PAGE = 1000
+
+# Bulk mode: concurrent requests, and retry policy for rate limits / server errors
+DEFAULT_WORKERS = 8
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5
+# (connect, read) seconds; the read timeout applies per socket read, so a stalled
+# connection is retried instead of blocking its worker forever.
+REQUEST_TIMEOUT = (10, 60)
+
+# Cloudflare allows 1200 requests per 5 minutes per user, i.e. 4 requests/sec
+DEFAULT_RATE = 4.0
+DEFAULT_ZONE_WORKERS = 4
 
 def get_api_token():
     """Prompt user for the Cloudflare API token."""
     return input("Enter your Cloudflare API token: ")
 
-def list_dns_records(api_token):
-    """List all DNS records for the specified zone."""
+def dns_records_url(zone_id=ZONE_ID):
+    return f'{API_BASE}/zones/{zone_id}/dns_records'
+
+class TokenBucket:
+    """Thread-safe token bucket that spreads requests across the API budget.
+
+    The refill rate is halved on every 429 and climbs back towards the
+    configured rate as requests succeed (AIMD), so concurrent zones settle
+    just under whatever Cloudflare is currently willing to serve.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=None, min_rate=0.25):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.requests = 0
+        self.throttled = 0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    self.requests += 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def on_success(self):
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+    def on_throttle(self):
+        with self.lock:
+            self.throttled += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = 0
+
+class RateLimitedSession(requests.Session):
+    """Session that takes a token from a shared TokenBucket before every request."""
+
+    def __init__(self, limiter):
+        super().__init__()
+        self.limiter = limiter
+
+    def request(self, method, url, *args, **kwargs):
+        self.limiter.acquire()
+        response = super().request(method, url, *args, **kwargs)
+        if response.status_code == 429:
+            self.limiter.on_throttle()
+        else:
+            self.limiter.on_success()
+        return response
+
+def create_session(pool_size=DEFAULT_WORKERS, limiter=None):
+    """Create a keep-alive session whose connection pool matches the worker count."""
+    session = RateLimitedSession(limiter) if limiter else requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def request_with_retry(http, method, url, **kwargs):
+    """Send a request, retrying 429/5xx responses and connection errors with exponential backoff.
+
+    Honours Retry-After when Cloudflare sends it. The last response is
+    returned whatever its status; the last connection error is raised.
+    """
+    kwargs.setdefault('timeout', REQUEST_TIMEOUT)
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            response = http.request(method, url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == MAX_RETRIES:
+                raise
+            time.sleep(BACKOFF_BASE * 2 ** attempt + random.uniform(0, BACKOFF_BASE))
+            continue
+        if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            return response
+        retry_after = response.headers.get('Retry-After', '')
+        delay = float(retry_after) if retry_after.isdigit() else BACKOFF_BASE * 2 ** attempt
+        time.sleep(delay + random.uniform(0, BACKOFF_BASE))
+
+def list_zones(api_token, session=None, name_suffix=None):
+    """Discover every zone the token can see, optionally filtered by name suffix."""
     headers = {
         'Authorization': f'Bearer {api_token}',
         'Content-Type': 'application/json',
     }
-    response = requests.get(API_URL, headers=headers)
-    if response.status_code == 200:
-        return response.json()
-    else:
+    zones = []
+    page = 1
+    while True:
+        params = {'page': page, 'per_page': 50}
+        response = request_with_retry(session or requests, 'GET', f'{API_BASE}/zones', headers=headers, params=params)
+        if response.status_code != 200:
+            print(f"Error: {response.status_code} - {response.text}")
+            return None
+        body = response.json()
+        zones.extend({'id': zone['id'], 'name': zone['name']} for zone in body['result'])
+        if page >= body.get('result_info', {}).get('total_pages', 1):
+            break
+        page += 1
+    if name_suffix:
+        zones = [zone for zone in zones if zone['name'] == name_suffix or zone['name'].endswith('.' + name_suffix)]
+    return zones
+
+def get_zone(api_token, zone_id=ZONE_ID, session=None):
+    """Look up a zone by id; returns {'id', 'name'} or None."""
+    headers = {
+        'Authorization': f'Bearer {api_token}',
+        'Content-Type': 'application/json',
+    }
+    response = request_with_retry(session or requests, 'GET', f'{API_BASE}/zones/{zone_id}', headers=headers)
+    if response.status_code != 200:
         print(f"Error: {response.status_code} - {response.text}")
         return None
+    zone = response.json()['result']
+    return {'id': zone['id'], 'name': zone['name']}
+
+def list_dns_records(api_token, session=None, zone_id=ZONE_ID):
+    """List all DNS records for the specified zone, following every result page."""
+    headers = {
+        'Authorization': f'Bearer {api_token}',
+        'Content-Type': 'application/json',
+    }
+    records = []
+    page = 1
+    while True:
+        params = {'page': page, 'per_page': PER_PAGE}
+        response = request_with_retry(session or requests, 'GET', dns_records_url(zone_id), headers=headers,
+                                      params=params)
+        if response.status_code != 200:
+            print(f"Error: {response.status_code} - {response.text}")
+            return None
+        body = response.json()
+        records.extend(body['result'])
+        if page >= body.get('result_info', {}).get('total_pages', 1):
+            break
+        page += 1
+    return {'success': True, 'result': records}
 
-def add_dns_record(api_token, record_type, name, content, ttl=3600, proxied=False):
+def add_dns_record(api_token, record_type, name, content, ttl=3600, proxied=False, priority=None, session=None,
+                   zone_id=ZONE_ID):
     """Add a new DNS record."""
     headers = {
         'Authorization': f'Bearer {api_token}',
@@ -36,43 +201,515 @@ def add_dns_record(api_token, record_type, name, content, ttl=3600, proxied=Fals
         'ttl': ttl,
         'proxied': proxied
     }
-    response = requests.post(API_URL, headers=headers, json=data)
+    if priority is not None:
+        data['priority'] = priority
+    response = request_with_retry(session or requests, 'POST', dns_records_url(zone_id), headers=headers, json=data)
     if response.status_code == 200:
         return response.json()
     else:
         print(f"Error: {response.status_code} - {response.text}")
         return None
 
-def delete_dns_record(api_token, record_id):
+def delete_dns_record(api_token, record_id, session=None, zone_id=ZONE_ID):
     """Delete a DNS record."""
     headers = {
         'Authorization': f'Bearer {api_token}',
         'Content-Type': 'application/json',
     }
-    delete_url = f"{API_URL}/{record_id}"
-    response = requests.delete(delete_url, headers=headers)
+    delete_url = f"{dns_records_url(zone_id)}/{record_id}"
+    response = request_with_retry(session or requests, 'DELETE', delete_url, headers=headers)
+    if response.status_code == 200:
+        return response.json()
+    else:
+        print(f"Error: {response.status_code} - {response.text}")
+        return None
+
+def update_dns_record(api_token, record_id, fields, session=None, zone_id=ZONE_ID):
+    """Patch the given fields of an existing DNS record."""
+    headers = {
+        'Authorization': f'Bearer {api_token}',
+        'Content-Type': 'application/json',
+    }
+    update_url = f"{dns_records_url(zone_id)}/{record_id}"
+    response = request_with_retry(session or requests, 'PATCH', update_url, headers=headers, json=fields)
     if response.status_code == 200:
         return response.json()
     else:
         print(f"Error: {response.status_code} - {response.text}")
         return None
 
+class DNSRecordIndex:
+    """Local cache of a zone's DNS records, indexed by id, name and type.
+
+    Names are also kept reversed in a sorted list so a name-suffix lookup
+    (e.g. all records under "dev.example.com") is a bisect rather than a scan.
+    """
+
+    def __init__(self, records=()):
+        self.by_id = {}
+        self.by_name = defaultdict(set)
+        self.by_type = defaultdict(set)
+        self._reversed_names = []
+        for record in records:
+            self.add(record)
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def add(self, record):
+        """Add or replace a record, e.g. from an add_dns_record response."""
+        if record['id'] in self.by_id:
+            self.remove(record['id'])
+        name = record['name'].lower()
+        self.by_id[record['id']] = record
+        self.by_name[name].add(record['id'])
+        self.by_type[record['type']].add(record['id'])
+        bisect.insort(self._reversed_names, (name[::-1], record['id']))
+
+    def remove(self, record_id):
+        """Drop a record, e.g. after delete_dns_record succeeds."""
+        record = self.by_id.pop(record_id, None)
+        if record is None:
+            return None
+        name = record['name'].lower()
+        self.by_name[name].discard(record_id)
+        if not self.by_name[name]:
+            del self.by_name[name]
+        self.by_type[record['type']].discard(record_id)
+        if not self.by_type[record['type']]:
+            del self.by_type[record['type']]
+        pos = bisect.bisect_left(self._reversed_names, (name[::-1], record_id))
+        del self._reversed_names[pos]
+        return record
+
+    def find(self, record_type, name, content=None):
+        """Records with exactly this type and name (and content, if given)."""
+        ids = self.by_name.get(name.lower(), set()) & self.by_type.get(record_type.upper(), set())
+        return [self.by_id[i] for i in ids if content is None or self.by_id[i]['content'] == content]
+
+    def records(self):
+        """All records, ordered by type then name."""
+        return sorted(self.by_id.values(), key=lambda r: (r['type'], r['name']))
+
+    def filter(self, name_suffix=None, record_type=None):
+        """Records whose name ends with name_suffix and/or whose type matches."""
+        if name_suffix:
+            suffix = name_suffix.lower().lstrip('.')[::-1]
+            start = bisect.bisect_left(self._reversed_names, (suffix,))
+            ids = set()
+            for reversed_name, record_id in self._reversed_names[start:]:
+                if not reversed_name.startswith(suffix):
+                    break
+                # Match whole labels: "example.com" shouldn't match "badexample.com".
+                if len(reversed_name) == len(suffix) or reversed_name[len(suffix)] == '.':
+                    ids.add(record_id)
+        else:
+            ids = set(self.by_id)
+        if record_type:
+            ids &= self.by_type.get(record_type.upper(), set())
+        return sorted((self.by_id[i] for i in ids), key=lambda r: (r['type'], r['name']))
+
+def load_dns_index(api_token, session=None, zone_id=ZONE_ID):
+    """Fetch every record in the zone into a fresh DNSRecordIndex."""
+    dns_records = list_dns_records(api_token, session, zone_id)
+    return DNSRecordIndex(dns_records['result'] if dns_records else [])
+
+def _strip_zone_comment(line):
+    """Remove a trailing ';' comment, ignoring semicolons inside quoted strings."""
+    in_quotes = False
+    for idx, char in enumerate(line):
+        if char == '"':
+            in_quotes = not in_quotes
+        elif char == ';' and not in_quotes:
+            return line[:idx]
+    return line
+
+def _qualify(name, origin):
+    """Turn a zone-file name into the fully qualified form Cloudflare expects."""
+    if name == '@':
+        return origin
+    if name.endswith('.'):
+        return name[:-1]
+    return f"{name}.{origin}" if origin else name
+
+def parse_zone_file(path, action='add', origin=''):
+    """Parse a BIND-style zone file into bulk operations.
+
+    Handles $ORIGIN/$TTL, '@', relative names, blank owner names and
+    parenthesised multi-line records. SOA and apex NS records are skipped
+    because Cloudflare manages them itself. origin is used for relative
+    names until the file sets its own $ORIGIN.
+    """
+    default_ttl = 3600
+    last_name = None
+    operations = []
+    pending = ''
+
+    with open(path, encoding='utf-8') as f:
+        for raw_line in f:
+            line = _strip_zone_comment(raw_line.rstrip('\n'))
+            if pending:
+                line = pending + ' ' + line.strip()
+            if line.count('(') > line.count(')'):
+                pending = line
+                continue
+            pending = ''
+            if not line.strip():
+                continue
+
+            if line.startswith('$ORIGIN'):
+                origin = line.split()[1].rstrip('.')
+                continue
+            if line.startswith('$TTL'):
+                default_ttl = int(line.split()[1])
+                continue
+
+            tokens = shlex.split(line.replace('(', ' ').replace(')', ' '), posix=True)
+            if line[0] in ' \t':
+                name = last_name
+            else:
+                name = _qualify(tokens.pop(0), origin)
+                last_name = name
+
+            ttl = default_ttl
+            while tokens and (tokens[0].isdigit() or tokens[0].upper() in ('IN', 'CH', 'HS')):
+                token = tokens.pop(0)
+                if token.isdigit():
+                    ttl = int(token)
+            if not tokens:
+                continue
+            record_type = tokens.pop(0).upper()
+            rdata = tokens
+
+            if record_type == 'SOA' or (record_type == 'NS' and name == origin):
+                continue
+
+            operation = {'action': action, 'type': record_type, 'name': name, 'ttl': ttl, 'proxied': False}
+            if record_type == 'MX':
+                operation['priority'] = int(rdata[0])
+                operation['content'] = _qualify(rdata[1], origin)
+            elif record_type in ('CNAME', 'NS', 'PTR'):
+                operation['content'] = _qualify(rdata[0], origin)
+            elif record_type == 'TXT':
+                operation['content'] = ''.join(rdata)
+            else:
+                operation['content'] = ' '.join(rdata)
+            operations.append(operation)
+    return operations
+
+def parse_csv_file(path):
+    """Parse a CSV of bulk operations.
+
+    Columns: action (add/delete, default add), id, type, name, content, ttl,
+    proxied, priority. Deletes need either an id or a type and name (content
+    optional) to match against the zone; adds need content. Raises ValueError
+    with the line number for rows that can't be applied.
+    """
+    operations = []
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            row = {key.strip().lower(): (value or '').strip() for key, value in row.items() if key}
+            operation = {
+                'action': row.get('action', '').lower() or 'add',
+                'id': row.get('id') or None,
+                'type': row.get('type', '').upper(),
+                'name': row.get('name', ''),
+                'content': row.get('content') or None,
+                'ttl': int(row['ttl']) if row.get('ttl') else 3600,
+                'proxied': row.get('proxied', '').lower() == 'true',
+            }
+            if row.get('priority'):
+                operation['priority'] = int(row['priority'])
+            if operation['action'] not in ('add', 'delete'):
+                raise ValueError(f"{path}:{reader.line_num}: unknown action '{operation['action']}' "
+                                 "(expected add or delete)")
+            if operation['action'] == 'add' and not operation['content']:
+                raise ValueError(f"{path}:{reader.line_num}: {operation['type']} {operation['name']} has no content")
+            if operation['action'] == 'delete' and not operation['id'] and not (operation['type'] and operation['name']):
+                raise ValueError(f"{path}:{reader.line_num}: delete needs an id or a type and name")
+            operations.append(operation)
+    return operations
+
+def load_operations(path, file_format=None, action='add', origin=''):
+    """Read bulk operations from a CSV or BIND-style zone file."""
+    file_format = file_format or ("csv" if path.lower().endswith(".csv") else "bind")
+    if file_format == "csv":
+        return parse_csv_file(path)
+    return parse_zone_file(path, action, origin)
+
+def resolve_deletes(api_token, operations, session=None, zone_id=ZONE_ID):
+    """Fill in record ids for deletes that only give type/name/content."""
+    if all(op['action'] != 'delete' or op.get('id') for op in operations):
+        return operations
+    dns_records = list_dns_records(api_token, session, zone_id)
+    index = DNSRecordIndex(dns_records['result'] if dns_records else [])
+    resolved = []
+    for op in operations:
+        if op['action'] != 'delete' or op.get('id'):
+            resolved.append(op)
+            continue
+        matches = index.find(op['type'], op['name'], op.get('content'))
+        if not matches:
+            print(f"No matching record to delete: {op['type']} {op['name']} {op.get('content') or ''}")
+        for record in matches:
+            resolved.append(dict(op, id=record['id']))
+    return resolved
+
+def bulk_apply(api_token, operations, max_workers=DEFAULT_WORKERS, zone_id=ZONE_ID, session=None):
+    """Run add/update/delete operations concurrently over one pooled session.
+
+    Deletes run first, then adds and updates, so replacing a record with one of
+    another type on the same name doesn't conflict with the record it replaces.
+    A caller-supplied session (e.g. one shared across zones) is used as is;
+    otherwise a session sized to max_workers is created for the run.
+    Returns a list of (operation, ok, seconds) tuples and prints a throughput report.
+    """
+    max_workers = max(1, max_workers)
+
+    def apply(op):
+        started = time.perf_counter()
+        try:
+            if op['action'] == 'delete':
+                result = delete_dns_record(api_token, op['id'], session=session, zone_id=zone_id)
+            elif op['action'] == 'update':
+                result = update_dns_record(api_token, op['id'], op['fields'], session=session, zone_id=zone_id)
+            else:
+                result = add_dns_record(api_token, op['type'], op['name'], op['content'], op['ttl'], op['proxied'],
+                                        op.get('priority'), session=session, zone_id=zone_id)
+        except requests.RequestException as e:
+            # Still failing after retries: record it and keep going, so the report covers every record
+            print(f"Error: {op['action']} {op['type']} {op['name']}: {e}")
+            result = None
+        return op, bool(result), time.perf_counter() - started
+
+    results = []
+    owns_session = session is None
+    if owns_session:
+        session = create_session(max_workers)
+    try:
+        operations = resolve_deletes(api_token, operations, session, zone_id)
+        run_started = time.perf_counter()
+        deletes = [op for op in operations if op['action'] == 'delete']
+        others = [op for op in operations if op['action'] != 'delete']
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for phase in (deletes, others):
+                futures = [executor.submit(apply, op) for op in phase]
+                for future in as_completed(futures):
+                    results.append(future.result())
+        elapsed = time.perf_counter() - run_started
+    finally:
+        if owns_session:
+            session.close()
+
+    print_bulk_report(results, elapsed, max_workers)
+    return results
+
+def print_bulk_report(results, elapsed, max_workers):
+    """Print success counts, requests/sec and latency percentiles for a bulk run."""
+    latencies = sorted(seconds for _, _, seconds in results)
+    print(f"\nBulk summary ({max_workers} worker(s)):")
+    for action in ('add', 'update', 'delete'):
+        done = [ok for op, ok, _ in results if op['action'] == action]
+        if done:
+            print(f"  {action.capitalize():7} {sum(done)} succeeded, {len(done) - sum(done)} failed")
+    print(f"  Wall time: {elapsed:.2f}s")
+    if elapsed > 0:
+        print(f"  Throughput: {len(results) / elapsed:.1f} records/sec")
+    if latencies:
+        p50 = latencies[len(latencies) // 2]
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"  Latency: p50 {p50 * 1000:.0f}ms, p99 {p99 * 1000:.0f}ms, max {latencies[-1] * 1000:.0f}ms")
+    for op, ok, _ in results:
+        if not ok:
+            print(f"  FAILED {op['action']} {op['type']} {op['name']} {op.get('content') or op.get('id') or ''}")
+
+# Record types whose content is a hostname, which Cloudflare compares case-insensitively
+HOSTNAME_TYPES = {'CNAME', 'MX', 'NS', 'PTR'}
+
+def _record_key(record):
+    """Hash-join key for matching desired records against live ones."""
+    content = record['content']
+    if record['type'] in HOSTNAME_TYPES:
+        content = content.lower().rstrip('.')
+    return record['type'].upper(), record['name'].lower().rstrip('.'), content
+
+def _changed_fields(desired, live):
+    """Settings that differ between a desired record and the live record it matched."""
+    fields = {}
+    if desired.get('proxied', False) != live.get('proxied', False):
+        fields['proxied'] = desired.get('proxied', False)
+    # Proxied records always report ttl=1 (automatic), so only compare unproxied TTLs.
+    if not desired.get('proxied') and desired.get('ttl') and desired['ttl'] != live.get('ttl'):
+        fields['ttl'] = desired['ttl']
+    if desired.get('priority') is not None and desired['priority'] != live.get('priority'):
+        fields['priority'] = desired['priority']
+    return fields
+
+def compute_changeset(desired_records, live_records):
+    """Compute the minimal list of operations that turns live_records into desired_records.
+
+    Records are hash-joined on (type, name, content). Exact matches become
+    no-ops or in-place setting updates; a leftover create and delete with the
+    same (type, name) are folded into one content update instead of two calls.
+    """
+    live_by_key = defaultdict(list)
+    for record in live_records:
+        live_by_key[_record_key(record)].append(record)
+
+    operations = []
+    creates = []
+    for desired in desired_records:
+        matches = live_by_key.get(_record_key(desired))
+        if matches:
+            live = matches.pop()
+            fields = _changed_fields(desired, live)
+            if fields:
+                operations.append(dict(desired, action='update', id=live['id'], fields=fields))
+        else:
+            creates.append(desired)
+
+    leftovers = defaultdict(list)
+    for records in live_by_key.values():
+        for record in records:
+            leftovers[(record['type'].upper(), record['name'].lower())].append(record)
+
+    for desired in creates:
+        candidates = leftovers.get((desired['type'].upper(), desired['name'].lower().rstrip('.')))
+        if candidates:
+            live = candidates.pop()
+            fields = dict(_changed_fields(desired, live), content=desired['content'])
+            operations.append(dict(desired, action='update', id=live['id'], fields=fields))
+        else:
+            operations.append(dict(desired, action='add'))
+
+    for records in leftovers.values():
+        for record in records:
+            operations.append({'action': 'delete', 'id': record['id'], 'type': record['type'],
+                               'name': record['name'], 'content': record['content']})
+    return operations
+
+def print_plan(operations):
+    """Print a changeset as +/~/- lines, like a terraform plan."""
+    if not operations:
+        print("Zone is already in the desired state; no changes.")
+        return
+    symbols = {'add': '+', 'update': '~', 'delete': '-'}
+    for op in sorted(operations, key=lambda o: (o['name'], o['type'], o['action'])):
+        line = f"  {symbols[op['action']]} {op['type']:6} {op['name']} {op.get('content') or ''}"
+        if op['action'] == 'update':
+            line += f"  ({', '.join(f'{k}={v}' for k, v in op['fields'].items())})"
+        print(line)
+    counts = {action: sum(op['action'] == action for op in operations) for action in symbols}
+    print(f"Plan: {counts['add']} to add, {counts['update']} to update, {counts['delete']} to delete.")
+
+def unqualified_names(records, zone_name):
+    """Names of records that are empty or don't lie within zone_name."""
+    zone_name = zone_name.lower().rstrip('.')
+    names = {record['name'].lower().rstrip('.') for record in records}
+    return sorted(name for name in names if not name or (name != zone_name and not name.endswith('.' + zone_name)))
+
+def sync_zone(api_token, desired_records, dry_run=False, max_workers=DEFAULT_WORKERS, zone_id=ZONE_ID, session=None):
+    """Make the zone match desired_records, applying only the computed diff.
+
+    A converged zone costs a single paginated listing.
+    """
+    dns_records = list_dns_records(api_token, session, zone_id)
+    if dns_records is None:
+        return None
+    operations = compute_changeset(desired_records, dns_records['result'])
+    print_plan(operations)
+    if dry_run or not operations:
+        return operations
+    return bulk_apply(api_token, operations, max_workers, zone_id, session)
+
+def run_zone_task(api_token, zone, task, records_file=None, file_format=None, delete=False, dry_run=False,
+                  max_workers=DEFAULT_WORKERS, session=None):
+    """Run one list/bulk/sync task against a single zone and return a short status line."""
+    if task == 'list':
+        dns_records = list_dns_records(api_token, session, zone['id'])
+        if dns_records is None:
+            return False, "listing failed"
+        return True, f"{len(dns_records['result'])} records"
+
+    # Relative names in a shared zone file are resolved against each zone's own name,
+    # so zones given by id need their name looked up first.
+    if not zone['name']:
+        found = get_zone(api_token, zone['id'], session)
+        if found is None:
+            return False, "zone lookup failed"
+        zone['name'] = found['name']
+    operations = load_operations(records_file, file_format, 'delete' if delete else 'add', zone['name'])
+    if task == 'sync':
+        desired_records = [op for op in operations if op['action'] == 'add']
+        # A name outside the zone would never match a live record, so every live record
+        # would be planned for deletion.
+        outside = unqualified_names(desired_records, zone['name'])
+        if outside:
+            return False, f"refusing to sync, names not in {zone['name']}: {', '.join(repr(n) for n in outside[:5])}"
+        result = sync_zone(api_token, desired_records, dry_run, max_workers, zone['id'], session)
+        if result is None:
+            return False, "listing failed"
+        if dry_run:
+            return True, f"{len(result)} change(s) planned"
+        if not result:
+            return True, "already in the desired state"
+    else:
+        result = bulk_apply(api_token, operations, max_workers, zone['id'], session)
+    failed = sum(not ok for _, ok, _ in result)
+    return not failed, f"{len(result) - failed} applied, {failed} failed"
+
+def run_zones(api_token, zones, task, records_file=None, file_format=None, delete=False, dry_run=False,
+              max_workers=DEFAULT_WORKERS, zone_workers=DEFAULT_ZONE_WORKERS, rate=DEFAULT_RATE):
+    """Fan a task out across many zones under one shared, adaptive request budget.
+
+    Every zone shares a single pooled session whose TokenBucket keeps the
+    whole run within Cloudflare's rate limit and backs off on 429s.
+    """
+    limiter = TokenBucket(rate)
+    zone_workers = max(1, zone_workers)
+    results = []
+
+    def run(zone):
+        started = time.perf_counter()
+        try:
+            ok, detail = run_zone_task(api_token, zone, task, records_file, file_format, delete, dry_run,
+                                       max_workers, session)
+        except Exception as e:
+            ok, detail = False, f"error: {e}"
+        return zone, ok, detail, time.perf_counter() - started
+
+    run_started = time.perf_counter()
+    with create_session(zone_workers * max(1, max_workers), limiter) as session, \
+            ThreadPoolExecutor(max_workers=zone_workers) as executor:
+        futures = [executor.submit(run, zone) for zone in zones]
+        for future in as_completed(futures):
+            results.append(future.result())
+    elapsed = time.perf_counter() - run_started
+
+    print(f"\nZone summary ({len(zones)} zone(s), {zone_workers} at a time):")
+    for zone, ok, detail, seconds in sorted(results, key=lambda r: r[3], reverse=True):
+        label = zone['name'] or zone['id']
+        print(f"  {'OK  ' if ok else 'FAIL'} {seconds:7.2f}s  {label}: {detail}")
+    print(f"  Wall time: {elapsed:.2f}s, {limiter.requests} requests "
+          f"({limiter.requests / elapsed if elapsed else 0:.1f}/sec), {limiter.throttled} throttled (429), "
+          f"final rate {limiter.rate:.2f}/sec")
+    return results
+
 def print_dns_records(records):
-    """Print DNS records with numbers."""
+    """Print a list of DNS records with numbers."""
     if records:
         print("DNS Records:")
-        for idx, record in enumerate(records['result'], start=1):
+        for idx, record in enumerate(records, start=1):
             print(f"{idx}. ID: {record['id']}, Type: {record['type']}, Name: {record['name']}, Content: {record['content']}, Proxied: {record['proxied']}")
     else:
         print("No DNS records found.")
 
-if __name__ == "__main__":
-    # Prompt the user for the API token
-    api_token = get_api_token()
-
-    # List DNS records initially
-    dns_records = list_dns_records(api_token)
-    print_dns_records(dns_records)
+def run_menu(api_token, zone_id=ZONE_ID):
+    """Interactive view/add/delete/filter loop."""
+    # Fetch every DNS record once; the index is kept current from add/delete responses
+    dns_index = load_dns_index(api_token, zone_id=zone_id)
+    print_dns_records(dns_index.records())
 
     # User interaction loop
     while True:
@@ -80,14 +717,15 @@ if __name__ == "__main__":
         print("1. View current DNS records")
         print("2. Add a new DNS record")
         print("3. Delete an existing DNS record")
-        print("4. Exit")
+        print("4. Filter DNS records by name suffix and/or type")
+        print("5. Refresh DNS records from Cloudflare")
+        print("6. Exit")
 
-        choice = input("Enter your choice (1/2/3/4): ")
+        choice = input("Enter your choice (1/2/3/4/5/6): ")
 
         if choice == '1':
             # View current DNS records
-            dns_records = list_dns_records(api_token)
-            print_dns_records(dns_records)
+            print_dns_records(dns_index.records())
 
         elif choice == '2':
             # Add a new DNS record
@@ -103,35 +741,94 @@ if __name__ == "__main__":
             name = input("Enter record name: ")
             content = input("Enter record content: ")
             proxied = input("Is the record proxied? (True/False): ").lower() == 'true'
-            
-            new_record = add_dns_record(api_token, record_type, name, content, proxied=proxied)
+
+            new_record = add_dns_record(api_token, record_type, name, content, proxied=proxied, zone_id=zone_id)
             if new_record:
+                dns_index.add(new_record['result'])
                 print("Added DNS Record:", new_record)
 
         elif choice == '3':
             # Delete an existing DNS record
-            dns_records = list_dns_records(api_token)  # Fetch updated list before deletion
-            print_dns_records(dns_records)
+            name_suffix = input("Limit to names ending with (blank for all): ").strip()
+            record_type = input("Limit to record type (blank for all): ").strip()
+            records = dns_index.filter(name_suffix or None, record_type or None)
+            print_dns_records(records)
 
             delete_choices = input("Enter the numbers of the records to delete (e.g., 1 3 4) or 'b' to go back: ")
             if delete_choices.lower() == 'b':
                 continue
 
-            delete_ids = [dns_records['result'][int(idx)-1]['id'] for idx in delete_choices.split() if int(idx) <= len(dns_records['result'])]
-            
+            delete_ids = [records[int(idx)-1]['id'] for idx in delete_choices.split() if 0 < int(idx) <= len(records)]
+
             for record_id in delete_ids:
-                deleted_record = delete_dns_record(api_token, record_id)
+                deleted_record = delete_dns_record(api_token, record_id, zone_id=zone_id)
                 if deleted_record:
+                    dns_index.remove(record_id)
                     print(f"Deleted DNS Record ID {record_id}")
 
-            # Fetch updated list after deletion
-            dns_records = list_dns_records(api_token)
-            print_dns_records(dns_records)
+            print_dns_records(dns_index.filter(name_suffix or None, record_type or None))
 
         elif choice == '4':
+            # Filter the cached records without going back to the API
+            name_suffix = input("Name suffix (e.g. dev.example.com, blank for any): ").strip()
+            record_type = input("Record type (e.g. A, CNAME, blank for any): ").strip()
+            print_dns_records(dns_index.filter(name_suffix or None, record_type or None))
+
+        elif choice == '5':
+            # Re-fetch every page, e.g. after changes made outside this tool
+            dns_index = load_dns_index(api_token, zone_id=zone_id)
+            print(f"Loaded {len(dns_index)} DNS records.")
+
+        elif choice == '6':
             # Exit the program
             print("Exiting...")
             break
 
         else:
-            print("Invalid choice. Please enter 1, 2, 3, or 4.")
+            print("Invalid choice. Please enter 1, 2, 3, 4, 5, or 6.")
+
+def cli(argv=None, prog=None):
+    """Command-line entry point; argv defaults to sys.argv[1:]."""
+    parser = argparse.ArgumentParser(prog=prog, description="Manage Cloudflare DNS records.")
+    parser.add_argument("--bulk", metavar="FILE",
+                        help="Non-interactively apply a CSV or BIND-style zone file instead of opening the menu")
+    parser.add_argument("--sync", metavar="FILE",
+                        help="Make the zone match a desired-state CSV or BIND-style zone file")
+    parser.add_argument("--list", action="store_true", help="Count the records in each zone")
+    parser.add_argument("--dry-run", action="store_true", help="With --sync, only print the plan")
+    parser.add_argument("--format", choices=["csv", "bind"],
+                        help="Format of the --bulk/--sync file (default: csv for *.csv, otherwise bind)")
+    parser.add_argument("--delete", action="store_true",
+                        help="Delete the records listed in a BIND --bulk file instead of adding them")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Maximum concurrent API requests per zone in bulk mode (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--zones", help=f"Comma-separated zone IDs to operate on (default: {ZONE_ID})")
+    parser.add_argument("--all-zones", action="store_true", help="Discover and operate on every zone in the account")
+    parser.add_argument("--zone-suffix", help="With --all-zones, only zones whose name ends with this suffix")
+    parser.add_argument("--zone-workers", type=int, default=DEFAULT_ZONE_WORKERS,
+                        help=f"Zones processed concurrently (default: {DEFAULT_ZONE_WORKERS})")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                        help=f"Shared request budget in requests/sec across all zones (default: {DEFAULT_RATE})")
+    args = parser.parse_args(argv)
+
+    # Prompt the user for the API token unless it's in the environment
+    api_token = os.environ.get("CLOUDFLARE_API_TOKEN") or get_api_token()
+
+    if args.all_zones:
+        zones = list_zones(api_token, name_suffix=args.zone_suffix) or []
+    elif args.zones:
+        zones = [{'id': zone_id.strip(), 'name': None} for zone_id in args.zones.split(",")]
+    else:
+        zones = [{'id': ZONE_ID, 'name': None}]
+    if not zones:
+        parser.exit(1, "No zones to operate on.\n")
+
+    task = 'sync' if args.sync else 'bulk' if args.bulk else 'list' if args.list else None
+    if task is None:
+        run_menu(api_token, zones[0]['id'])
+    else:
+        run_zones(api_token, zones, task, args.sync or args.bulk, args.format, args.delete, args.dry_run,
+                  args.workers, args.zone_workers, args.rate)
+
+if __name__ == "__main__":
+    cli()
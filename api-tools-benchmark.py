@@ -0,0 +1,371 @@
+import argparse
+import contextlib
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import shutil
+import socket
+import tarfile
+import tempfile
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO = "bench/repo"
+REF = "main"
+ZONE_ID = "benchzone"
+
+def _load(name, file_name):
+    # The tools can't be imported by name because of the dashes.
+    spec = importlib.util.spec_from_file_location(name, os.path.join(SCRIPT_DIR, file_name))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+downloader = _load("repo_download", "Downlaod-Files-From-Repo.py")
+cloudflare = _load("dnsrecord_cloudflare", "add-remove-dnsrecord-cloudflare.py")
+
+class MockState:
+    """Shared state and fault injection for the mock GitHub and Cloudflare endpoints."""
+
+    def __init__(self, latency=0.0, throttle_every=0, retry_after=1, page_size=100):
+        self.latency = latency
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.page_size = page_size
+        self.files = {}
+        self.records = {}
+        self.lock = threading.Lock()
+        self._tarball = None
+        self.reset_counters()
+
+    def reset_counters(self):
+        with self.lock:
+            self.requests = 0
+            self.bytes_sent = 0
+            self.statuses = {}
+
+    def set_files(self, count, size):
+        """count files of size bytes with distinct, incompressible-ish contents."""
+        self.files = {f"file-{i:04d}.txt": os.urandom(size // 2).hex().encode()[:size] for i in range(count)}
+        self._tarball = None
+
+    def set_records(self, count):
+        self.records = {}
+        for i in range(count):
+            record_id = uuid.uuid4().hex
+            self.records[record_id] = {"id": record_id, "type": "A", "name": f"host{i}.bench.example",
+                                       "content": f"10.0.{i // 256 % 256}.{i % 256}", "ttl": 3600, "proxied": False}
+
+    def blob_sha(self, name):
+        return hashlib.sha1(self.files[name]).hexdigest()
+
+    def tarball(self):
+        """gzipped tar of every file under "<owner>-<repo>-<sha>/", built once per file set."""
+        if self._tarball is None:
+            buffer = io.BytesIO()
+            with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+                for name, data in self.files.items():
+                    info = tarfile.TarInfo(f"bench-repo-0000000/{name}")
+                    info.size = len(data)
+                    archive.addfile(info, io.BytesIO(data))
+            self._tarball = buffer.getvalue()
+        return self._tarball
+
+class MockHandler(BaseHTTPRequestHandler):
+    """Serves /raw/... like raw.githubusercontent.com, /github/... like api.github.com and
+    /cloudflare/... like the Cloudflare v4 API."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive, so client connection pooling matters as it does live
+
+    def setup(self):
+        super().setup()
+        # Like real API front ends; otherwise Nagle + delayed ACK adds ~40ms to every response
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=None):
+        state = self.server.state
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode()
+            headers = dict(headers or {}, **{"Content-Type": "application/json"})
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        # Count before sending, so a finished client never sees stale counters
+        with state.lock:
+            state.bytes_sent += len(body)
+            state.statuses[status] = state.statuses.get(status, 0) + 1
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _dispatch(self):
+        state = self.server.state
+        with state.lock:
+            state.requests += 1
+            throttled = state.throttle_every and state.requests % state.throttle_every == 0
+        if state.latency:
+            time.sleep(state.latency)
+        if throttled:
+            return self._send(429, {"success": False, "errors": [{"code": 10000, "message": "Rate limited"}]},
+                              {"Retry-After": str(state.retry_after)})
+        url = urlsplit(self.path)
+        parts = url.path.strip("/").split("/")
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if parts[0] == "raw":
+            return self._raw("/".join(parts[4:]))
+        if parts[0] == "github":
+            return self._github(parts[1:])
+        if parts[0] == "cloudflare":
+            return self._cloudflare(parts[1:], query)
+        self._send(404, {"message": "Not Found"})
+
+    def _raw(self, name):
+        state = self.server.state
+        if name not in state.files:
+            return self._send(404, b"404: Not Found")
+        data = state.files[name]
+        etag = f'"{state.blob_sha(name)}"'
+        if self.headers.get("If-None-Match") == etag:
+            return self._send(304, headers={"ETag": etag})
+        byte_range = self.headers.get("Range", "")
+        if byte_range.startswith("bytes=") and byte_range.endswith("-"):
+            start = int(byte_range[len("bytes="):-1])
+            if start >= len(data):
+                return self._send(416)
+            return self._send(206, data[start:], {"ETag": etag,
+                                                  "Content-Range": f"bytes {start}-{len(data) - 1}/{len(data)}"})
+        self._send(200, data, {"ETag": etag})
+
+    def _github(self, parts):
+        # repos/<owner>/<repo>/{contents,git/trees/<ref>,tarball/<ref>}
+        state = self.server.state
+        endpoint = parts[3] if len(parts) > 3 else ""
+        if endpoint == "contents":
+            listing = [{"name": name, "path": name, "sha": state.blob_sha(name), "type": "file"}
+                       for name in sorted(state.files)]
+            etag = '"' + hashlib.sha1(json.dumps(listing).encode()).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                return self._send(304, headers={"ETag": etag})
+            return self._send(200, listing, {"ETag": etag})
+        if endpoint == "git":
+            tree = [{"path": name, "sha": state.blob_sha(name), "type": "blob"} for name in sorted(state.files)]
+            return self._send(200, {"tree": tree, "truncated": False})
+        if endpoint == "tarball":
+            return self._send(200, state.tarball(), {"Content-Type": "application/x-gzip"})
+        self._send(404, {"message": "Not Found"})
+
+    def _cloudflare(self, parts, query):
+        # zones/<zone>/dns_records[/<id>]
+        state = self.server.state
+        record_id = parts[3] if len(parts) > 3 else None
+        if self.command == "GET" and record_id is None:
+            per_page = min(int(query.get("per_page", state.page_size)), state.page_size)
+            page = int(query.get("page", 1))
+            records = list(state.records.values())
+            total_pages = max(1, -(-len(records) // per_page))
+            result = records[(page - 1) * per_page:page * per_page]
+            return self._send(200, {"success": True, "result": result,
+                                    "result_info": {"page": page, "per_page": per_page, "total_pages": total_pages,
+                                                    "count": len(result), "total_count": len(records)}})
+        if self.command == "POST":
+            record = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            record["id"] = uuid.uuid4().hex
+            with state.lock:
+                state.records[record["id"]] = record
+            return self._send(200, {"success": True, "result": record})
+        if record_id not in state.records:
+            return self._send(404, {"success": False, "errors": [{"code": 81044, "message": "Record not found"}]})
+        if self.command == "PATCH":
+            fields = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            with state.lock:
+                state.records[record_id].update(fields)
+            return self._send(200, {"success": True, "result": state.records[record_id]})
+        if self.command == "DELETE":
+            with state.lock:
+                del state.records[record_id]
+            return self._send(200, {"success": True, "result": {"id": record_id}})
+        self._send(405, {"success": False})
+
+    do_GET = do_POST = do_PATCH = do_DELETE = _dispatch
+
+def start_mock_server(state):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockHandler)
+    server.daemon_threads = True
+    server.state = state
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+class LatencyRecorder:
+    """Times every request the tools send, by wrapping requests.Session.send (so it covers
+    sessions and module-level requests.get alike). Streamed responses are timed to their headers."""
+
+    def __init__(self):
+        self.latencies = []
+        self.lock = threading.Lock()
+        self._send = requests.Session.send
+
+    def __enter__(self):
+        recorder = self
+
+        def send(session, request, **kwargs):
+            started = time.perf_counter()
+            try:
+                return recorder._send(session, request, **kwargs)
+            finally:
+                with recorder.lock:
+                    recorder.latencies.append(time.perf_counter() - started)
+
+        requests.Session.send = send
+        return self
+
+    def __exit__(self, *exc):
+        requests.Session.send = self._send
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+def measure(state, run, verbose=False):
+    """Run one tool mode against the mock and return its request metrics."""
+    state.reset_counters()
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    with LatencyRecorder() as recorder, output:
+        started = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - started
+    latencies = sorted(recorder.latencies)
+    return {
+        "requests": len(latencies),
+        "seconds": round(elapsed, 3),
+        "requests_per_sec": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "bytes": state.bytes_sent,
+        "throttled": state.statuses.get(429, 0),
+        "not_modified": state.statuses.get(304, 0),
+    }
+
+def github_modes(state, work_dir, workers):
+    """{mode: callable} for the repository downloader."""
+    names = sorted(state.files)
+
+    def fresh_dir(name):
+        path = os.path.join(work_dir, name)
+        shutil.rmtree(path, ignore_errors=True)
+        return path
+
+    sync_dir = os.path.join(work_dir, "sync")
+    return {
+        "list": lambda: downloader.list_files(REPO, ref=REF),
+        "download-sequential": lambda: downloader.download_files(REPO, names, fresh_dir("seq"), max_workers=1, ref=REF),
+        f"download-{workers}-workers": lambda: downloader.download_files(REPO, names, fresh_dir("par"),
+                                                                        max_workers=workers, ref=REF),
+        "sync-cold": lambda: downloader.sync_files(REPO, fresh_dir("sync"), max_workers=workers, ref=REF),
+        "sync-warm": lambda: downloader.sync_files(REPO, sync_dir, max_workers=workers, ref=REF),
+        "bulk": lambda: downloader.bulk_download(REPO, fresh_dir("bulk"), ref=REF, max_workers=workers),
+    }
+
+def cloudflare_modes(state, records, adds, workers, rate):
+    """{mode: callable} for the Cloudflare DNS tool."""
+    token = "bench-token"
+
+    def add_operations(prefix):
+        return [{"action": "add", "type": "A", "name": f"{prefix}{i}.bench.example", "content": "192.0.2.1",
+                 "ttl": 3600, "proxied": False} for i in range(adds)]
+
+    def sync():
+        state.set_records(records)
+        live = list(state.records.values())
+        # Desired state: drop a tenth, change a tenth, keep the rest, add `adds` new records
+        desired = [dict(record, action="add") for record in live[len(live) // 10:]]
+        for record in desired[:len(desired) // 9]:
+            record["content"] = "198.51.100.1"
+        desired += add_operations("new")
+        cloudflare.sync_zone(token, desired, max_workers=workers, zone_id=ZONE_ID)
+
+    def limited():
+        with cloudflare.create_session(workers, cloudflare.TokenBucket(rate)) as session:
+            cloudflare.bulk_apply(token, add_operations("limited"), workers, ZONE_ID, session)
+
+    return {
+        "list": lambda: (state.set_records(records), cloudflare.list_dns_records(token, zone_id=ZONE_ID)),
+        "bulk-add-sequential": lambda: cloudflare.bulk_apply(token, add_operations("seq"), 1, ZONE_ID),
+        f"bulk-add-{workers}-workers": lambda: cloudflare.bulk_apply(token, add_operations("par"), workers, ZONE_ID),
+        f"bulk-add-{rate:g}-per-sec": limited,
+        "sync": sync,
+    }
+
+def run_benchmark(args):
+    state = MockState(args.latency / 1000, args.throttle_every, args.retry_after, args.page_size)
+    server = start_mock_server(state)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    downloader.RAW_BASE = f"{base}/raw"
+    downloader.API_BASE = f"{base}/github"
+    cloudflare.API_BASE = f"{base}/cloudflare"
+
+    work_dir = tempfile.mkdtemp(prefix="api-bench-")
+    report = {"settings": {key: value for key, value in vars(args).items() if key != "json"}, "results": []}
+    try:
+        state.set_files(args.files, args.file_size)
+        tools = []
+        if args.tool in ("all", "github"):
+            tools.append(("github", github_modes(state, work_dir, args.workers)))
+        if args.tool in ("all", "cloudflare"):
+            tools.append(("cloudflare", cloudflare_modes(state, args.records, args.adds, args.workers, args.rate)))
+        for tool, modes in tools:
+            for mode, run in modes.items():
+                result = dict(tool=tool, mode=mode, **measure(state, run, args.verbose))
+                report["results"].append(result)
+                print_result(result)
+    finally:
+        server.shutdown()
+        shutil.rmtree(work_dir)
+    return report
+
+def print_header():
+    print(f"{'tool':11} {'mode':24} {'requests':>8} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'bytes':>11} {'429s':>5} {'304s':>5} {'wall s':>7}")
+
+def print_result(result):
+    print(f"{result['tool']:11} {result['mode']:24} {result['requests']:8} {result['requests_per_sec']:8.1f} "
+          f"{result['p50_ms']:8.2f} {result['p99_ms']:8.2f} {result['bytes']:11} {result['throttled']:5} "
+          f"{result['not_modified']:5} {result['seconds']:7.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the GitHub downloader and Cloudflare DNS tool against local mock APIs.")
+    parser.add_argument("--tool", choices=["all", "github", "cloudflare"], default="all")
+    parser.add_argument("--latency", type=float, default=20, help="Injected per-request latency in ms (default: 20)")
+    parser.add_argument("--throttle-every", type=int, default=0, metavar="N",
+                        help="Answer every Nth request with 429 (default: never)")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429s (default: 1)")
+    parser.add_argument("--page-size", type=int, default=100,
+                        help="Largest page the mock Cloudflare listing returns (default: 100)")
+    parser.add_argument("--files", type=int, default=50, help="Files in the mock repository (default: 50)")
+    parser.add_argument("--file-size", type=int, default=32 * 1024, help="Bytes per file (default: 32768)")
+    parser.add_argument("--records", type=int, default=1000, help="Records in the mock zone (default: 1000)")
+    parser.add_argument("--adds", type=int, default=100, help="Records created by the bulk modes (default: 100)")
+    parser.add_argument("--workers", type=int, default=8, help="Workers for the concurrent modes (default: 8)")
+    parser.add_argument("--rate", type=float, default=cloudflare.DEFAULT_RATE,
+                        help=f"Token bucket rate for the rate-limited mode (default: {cloudflare.DEFAULT_RATE})")
+    parser.add_argument("--verbose", action="store_true", help="Show the tools' own output")
+    parser.add_argument("--json", metavar="FILE", help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    print_header()
+    report = run_benchmark(args)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
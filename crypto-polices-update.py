@@ -1,37 +1,409 @@
-import shutil
+import argparse
+import hashlib
+import json
 import os
+import shlex
+import shutil
 import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# sshd reads its policy only at startup (via $CRYPTO_POLICY), so a restart is
+# needed when this file changes; the client-side back-ends take effect on the
+# next connection.
+SSHD_POLICY_FILE = "/etc/crypto-policies/back-ends/opensshserver.config"
 
-# Define file paths
-files = {
-    "/etc/crypto-policies/back-ends/libssh.config": """Ciphers aes256-gcm@openssh.com,aes256-ctr,aes128-gcm@openssh.com,aes128-ctr
-MACs hmac-sha2-256-etm@openssh.com,hmac-sha2-512-etm@openssh.com,hmac-sha2-256,hmac-sha2-512
-KexAlgorithms curve25519-sha256,curve25519-sha256@libssh.org,ecdh-sha2-nistp256,ecdh-sha2-nistp384,ecdh-sha2-nistp521,diffie-hellman-group-exchange-sha256,diffie-hellman-group14-sha256,diffie-hellman-group16-sha512,diffie-hellman-group18-sha512
-HostKeyAlgorithms ecdsa-sha2-nistp256,ecdsa-sha2-nistp256-cert-v01@openssh.com,ecdsa-sha2-nistp384,ecdsa-sha2-nistp384-cert-v01@openssh.com,ecdsa-sha2-nistp521,ecdsa-sha2-nistp521-cert-v01@openssh.com,ssh-ed25519,ssh-ed25519-cert-v01@openssh.com,rsa-sha2-256,rsa-sha2-256-cert-v01@openssh.com,rsa-sha2-512,rsa-sha2-512-cert-v01@openssh.com,ssh-rsa,ssh-rsa-cert-v01@openssh.com
-PubkeyAcceptedKeyTypes ecdsa-sha2-nistp256,ecdsa-sha2-nistp256-cert-v01@openssh.com,ecdsa-sha2-nistp384,ecdsa-sha2-nistp384-cert-v01@openssh.com,ecdsa-sha2-nistp521,ecdsa-sha2-nistp521-cert-v01@openssh.com,ssh-ed25519,ssh-ed25519-cert-v01@openssh.com,rsa-sha2-256,rsa-sha2-256-cert-v01@openssh.com,rsa-sha2-512,rsa-sha2-512-cert-v01@openssh.com,ssh-rsa,ssh-rsa-cert-v01@openssh.com
-""",
-    "/etc/crypto-policies/back-ends/openssh.config": """Ciphers aes256-gcm@openssh.com,aes256-ctr,aes128-gcm@openssh.com,aes128-ctr
-MACs hmac-sha2-256-etm@openssh.com,umac-128-etm@openssh.com,hmac-sha2-512-etm@openssh.com,hmac-sha2-256,umac-128@openssh.com,hmac-sha2-512
-GSSAPIKexAlgorithms gss-curve25519-sha256-,gss-nistp256-sha256-,gss-group14-sha256-,gss-group16-sha512-,gss-gex-sha1-,gss-group14-sha1-
-KexAlgorithms curve25519-sha256,curve25519-sha256@libssh.org,ecdh-sha2-nistp256,ecdh-sha2-nistp384,ecdh-sha2-nistp521,diffie-hellman-group-exchange-sha256,diffie-hellman-group14-sha256,diffie-hellman-group16-sha512,diffie-hellman-group18-sha512
-PubkeyAcceptedKeyTypes ecdsa-sha2-nistp256,ecdsa-sha2-nistp256-cert-v01@openssh.com,ecdsa-sha2-nistp384,ecdsa-sha2-nistp384-cert-v01@openssh.com,ecdsa-sha2-nistp521,ecdsa-sha2-nistp521-cert-v01@openssh.com,ssh-ed25519,ssh-ed25519-cert-v01@openssh.com,rsa-sha2-256,rsa-sha2-256-cert-v01@openssh.com,rsa-sha2-512,rsa-sha2-512-cert-v01@openssh.com,ssh-rsa,ssh-rsa-cert-v01@openssh.com
-CASignatureAlgorithms ecdsa-sha2-nistp256,ecdsa-sha2-nistp384,ecdsa-sha2-nistp521,ssh-ed25519,rsa-sha2-256,rsa-sha2-512,ssh-rsa
-""",
-    "/etc/crypto-policies/back-ends/opensshserver.config": """CRYPTO_POLICY='-oCiphers=aes256-gcm@openssh.com,aes256-ctr,aes128-gcm@openssh.com,aes128-ctr -oMACs=hmac-sha2-256-etm@openssh.com,umac-128-etm@openssh.com,hmac-sha2-512-etm@openssh.com,hmac-sha2-256,umac-128@openssh.com,hmac-sha2-512 -oGSSAPIKexAlgorithms=gss-curve25519-sha256-,gss-nistp256-sha256-,gss-group14-sha256-,gss-group16-sha512-,gss-gex-sha1-,gss-group14-sha1- -oKexAlgorithms=curve25519-sha256,curve25519-sha256@libssh.org,ecdh-sha2-nistp256,ecdh-sha2-nistp384,ecdh-sha2-nistp521,diffie-hellman-group-exchange-sha256,diffie-hellman-group14-sha256,diffie-hellman-group16-sha512,diffie-hellman-group18-sha512 -oHostKeyAlgorithms=ecdsa-sha2-nistp256,ecdsa-sha2-nistp256-cert-v01@openssh.com,ecdsa-sha2-nistp384,ecdsa-sha2-nistp384-cert-v01@openssh.com,ecdsa-sha2-nistp521,ecdsa-sha2-nistp521-cert-v01@openssh.com,ssh-ed25519,ssh-ed25519-cert-v01@openssh.com,rsa-sha2-256,rsa-sha2-256-cert-v01@openssh.com,rsa-sha2-512,rsa-sha2-512-cert-v01@openssh.com,ssh-rsa,ssh-rsa-cert-v01@openssh.com -oPubkeyAcceptedKeyTypes=ecdsa-sha2-nistp256,ecdsa-sha2-nistp256-cert-v01@openssh.com,ecdsa-sha2-nistp384,ecdsa-sha2-nistp384-cert-v01@openssh.com,ecdsa-sha2-nistp521,ecdsa-sha2-nistp521-cert-v01@openssh.com,ssh-ed25519,ssh-ed25519-cert-v01@openssh.com,rsa-sha2-256,rsa-sha2-256-cert-v01@openssh.com,rsa-sha2-512,rsa-sha2-512-cert-v01@openssh.com,ssh-rsa,ssh-rsa-cert-v01@openssh.com -oCASignatureAlgorithms=ecdsa-sha2-nistp256,ecdsa-sha2-nistp384,ecdsa-sha2-nistp521,ssh-ed25519,rsa-sha2-256,rsa-sha2-512,ssh-rsa'
-"""
+DEFAULT_CANARY = 1
+DEFAULT_MAX_WAVE = 32
+SSH_CONNECT_TIMEOUT = 10
+CONTROL_PERSIST = 120
+
+KEY_TYPES = [
+    "ecdsa-sha2-nistp256", "ecdsa-sha2-nistp256-cert-v01@openssh.com",
+    "ecdsa-sha2-nistp384", "ecdsa-sha2-nistp384-cert-v01@openssh.com",
+    "ecdsa-sha2-nistp521", "ecdsa-sha2-nistp521-cert-v01@openssh.com",
+    "ssh-ed25519", "ssh-ed25519-cert-v01@openssh.com",
+    "rsa-sha2-256", "rsa-sha2-256-cert-v01@openssh.com",
+    "rsa-sha2-512", "rsa-sha2-512-cert-v01@openssh.com",
+    "ssh-rsa", "ssh-rsa-cert-v01@openssh.com",
+]
+
+# The policy, defined once; every back-end file is rendered from it.
+POLICY = {
+    "ciphers": ["aes256-gcm@openssh.com", "aes256-ctr", "aes128-gcm@openssh.com", "aes128-ctr"],
+    "macs": ["hmac-sha2-256-etm@openssh.com", "umac-128-etm@openssh.com", "hmac-sha2-512-etm@openssh.com",
+             "hmac-sha2-256", "umac-128@openssh.com", "hmac-sha2-512"],
+    "gssapi_kex": ["gss-curve25519-sha256-", "gss-nistp256-sha256-", "gss-group14-sha256-", "gss-group16-sha512-",
+                   "gss-gex-sha1-", "gss-group14-sha1-"],
+    "kex": ["curve25519-sha256", "curve25519-sha256@libssh.org", "ecdh-sha2-nistp256", "ecdh-sha2-nistp384",
+            "ecdh-sha2-nistp521", "diffie-hellman-group-exchange-sha256", "diffie-hellman-group14-sha256",
+            "diffie-hellman-group16-sha512", "diffie-hellman-group18-sha512"],
+    "host_key_algorithms": KEY_TYPES,
+    "pubkey_types": KEY_TYPES,
+    "ca_signature_algorithms": ["ecdsa-sha2-nistp256", "ecdsa-sha2-nistp384", "ecdsa-sha2-nistp521", "ssh-ed25519",
+                                "rsa-sha2-256", "rsa-sha2-512", "ssh-rsa"],
 }
 
-# Backup and replace files
-for file_path, content in files.items():
-    backup_path = file_path + ".bak"
-    if os.path.exists(file_path):
-        shutil.copy2(file_path, backup_path)
-        print(f"Backup created: {backup_path}")
-    
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(content)
-        print(f"Updated: {file_path}")
-
-# Restart SSH service
-subprocess.run(["systemctl", "restart", "sshd"], check=True)
-print("SSHD service restarted successfully.")
+# Back-end file -> (format, [(option name, policy key)]), in the order the options are written.
+BACKENDS = {
+    "/etc/crypto-policies/back-ends/libssh.config": ("config", [
+        ("Ciphers", "ciphers"), ("MACs", "macs"), ("KexAlgorithms", "kex"),
+        ("HostKeyAlgorithms", "host_key_algorithms"), ("PubkeyAcceptedKeyTypes", "pubkey_types"),
+    ]),
+    "/etc/crypto-policies/back-ends/openssh.config": ("config", [
+        ("Ciphers", "ciphers"), ("MACs", "macs"), ("GSSAPIKexAlgorithms", "gssapi_kex"), ("KexAlgorithms", "kex"),
+        ("PubkeyAcceptedKeyTypes", "pubkey_types"), ("CASignatureAlgorithms", "ca_signature_algorithms"),
+    ]),
+    SSHD_POLICY_FILE: ("sshd-sysconfig", [
+        ("Ciphers", "ciphers"), ("MACs", "macs"), ("GSSAPIKexAlgorithms", "gssapi_kex"), ("KexAlgorithms", "kex"),
+        ("HostKeyAlgorithms", "host_key_algorithms"), ("PubkeyAcceptedKeyTypes", "pubkey_types"),
+        ("CASignatureAlgorithms", "ca_signature_algorithms"),
+    ]),
+}
+
+# Algorithms libssh doesn't implement; they are dropped from libssh.config.
+LIBSSH_UNSUPPORTED = {"umac-128-etm@openssh.com", "umac-128@openssh.com"}
+
+# Policy key -> `ssh -Q` queries whose union lists the names the local OpenSSH accepts.
+SSH_QUERIES = {
+    "ciphers": ["cipher"],
+    "macs": ["mac"],
+    "gssapi_kex": ["kex-gss"],
+    "kex": ["kex"],
+    "host_key_algorithms": ["HostKeyAlgorithms", "key", "key-cert", "sig"],
+    "pubkey_types": ["PubkeyAcceptedAlgorithms", "key", "key-cert", "sig"],
+    "ca_signature_algorithms": ["CASignatureAlgorithms", "sig"],
+}
+
+_render_cache = {}
+
+def policy_key(policy):
+    return hashlib.sha256(json.dumps(policy, sort_keys=True).encode("utf-8")).hexdigest()
+
+def render_backend(path, policy):
+    file_format, options = BACKENDS[path]
+    lines = []
+    for option, key in options:
+        names = policy[key]
+        if path.endswith("libssh.config"):
+            names = [name for name in names if name not in LIBSSH_UNSUPPORTED]
+        lines.append((option, ",".join(names)))
+    if file_format == "sshd-sysconfig":
+        return "CRYPTO_POLICY='" + " ".join(f"-o{option}={value}" for option, value in lines) + "'\n"
+    return "".join(f"{option} {value}\n" for option, value in lines)
+
+def render_policy(policy=POLICY):
+    """Render every back-end file from the policy. Results (and their digests) are cached
+    by policy content, so a fleet run renders once however many hosts it compares."""
+    key = policy_key(policy)
+    if key not in _render_cache:
+        rendered = {path: render_backend(path, policy) for path in BACKENDS}
+        digests = {path: content_digest(content.encode("utf-8")) for path, content in rendered.items()}
+        _render_cache[key] = (rendered, digests)
+    return _render_cache[key]
+
+def load_policy(path):
+    """Read a JSON policy; keys it doesn't set keep the built-in values."""
+    with open(path, encoding="utf-8") as f:
+        overrides = json.load(f)
+    unknown = set(overrides) - set(POLICY)
+    if unknown:
+        raise ValueError(f"Unknown policy keys: {', '.join(sorted(unknown))}")
+    return dict(POLICY, **overrides)
+
+def supported_algorithms(ssh="ssh"):
+    """Names the local OpenSSH accepts, per `ssh -Q` query; queries it doesn't know are omitted."""
+    supported = {}
+    for query in {query for queries in SSH_QUERIES.values() for query in queries}:
+        completed = subprocess.run([ssh, "-Q", query], capture_output=True, universal_newlines=True)
+        if completed.returncode == 0:
+            supported[query] = set(completed.stdout.split())
+    return supported
+
+def validate_policy(policy, ssh="ssh"):
+    """Return {policy key: [names unknown to the local OpenSSH]}; keys whose queries are
+    unavailable (e.g. kex-gss on builds without GSSAPI key exchange) are not checked."""
+    supported = supported_algorithms(ssh)
+    problems = {}
+    for key, queries in SSH_QUERIES.items():
+        available = [supported[query] for query in queries if query in supported]
+        if not available:
+            continue
+        known = set().union(*available)
+        unknown = [name for name in policy[key] if name not in known]
+        if unknown:
+            problems[key] = unknown
+    return problems
+
+
+def content_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+def file_digest(path):
+    """SHA-256 of a file's contents, or None if it doesn't exist."""
+    try:
+        with open(path, "rb") as f:
+            return content_digest(f.read())
+    except FileNotFoundError:
+        return None
+
+def find_drift(files):
+    """Return the paths whose on-disk contents differ from the wanted policy."""
+    return [path for path, content in files.items()
+            if file_digest(path) != content_digest(content.encode("utf-8"))]
+
+def rooted(files, root):
+    """Re-home the policy paths under root (e.g. a test tree or a mounted image)."""
+    if root in (None, "", "/"):
+        return files
+    return {os.path.join(root, path.lstrip("/")): content for path, content in files.items()}
+
+def atomic_write(path, content):
+    """Write content to path via a temp file in the same directory and rename it into place,
+    keeping the mode and ownership of any existing file."""
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            st = os.stat(path)
+            os.chmod(tmp_path, st.st_mode & 0o7777)
+            if hasattr(os, "chown"):
+                os.chown(tmp_path, st.st_uid, st.st_gid)
+        else:
+            os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def apply_policy(files, check_only=False):
+    """Bring the back-end files in line with the policy. Only files that differ are
+    backed up and rewritten; returns the list of paths that changed (or would change)."""
+    drift = find_drift(files)
+    for file_path in files:
+        if file_path not in drift:
+            print(f"Unchanged: {file_path}")
+        elif check_only:
+            print(f"Drift: {file_path}")
+        else:
+            backup_path = file_path + ".bak"
+            if os.path.exists(file_path):
+                shutil.copy2(file_path, backup_path)
+                print(f"Backup created: {backup_path}")
+            atomic_write(file_path, files[file_path])
+            print(f"Updated: {file_path}")
+    return drift
+
+def restart_sshd_if_needed(changed, sshd_policy_file=SSHD_POLICY_FILE):
+    if sshd_policy_file not in changed:
+        print("SSHD policy unchanged; no restart needed.")
+        return
+    # Restart SSH service
+    subprocess.run(["systemctl", "restart", "sshd"], check=True)
+    print("SSHD service restarted successfully.")
+
+class SSHPool:
+    """Multiplexed SSH: one ControlMaster connection per host, reused by every command
+    sent to that host, and closed together at the end."""
+
+    def __init__(self, ssh="ssh", options=()):
+        self.ssh = ssh
+        self.options = list(options)
+        self.control_dir = tempfile.mkdtemp(prefix="crypto-policy-ssh-")
+        self.hosts = set()
+
+    def _base(self, host, multiplex=True):
+        command = [self.ssh, "-o", "BatchMode=yes", "-o", f"ConnectTimeout={SSH_CONNECT_TIMEOUT}"]
+        if multiplex:
+            command += ["-o", "ControlMaster=auto", "-o", f"ControlPersist={CONTROL_PERSIST}",
+                        "-o", f"ControlPath={os.path.join(self.control_dir, '%C')}"]
+        else:
+            command += ["-o", "ControlMaster=no", "-o", "ControlPath=none"]
+        return command + self.options + [host]
+
+    def run(self, host, remote_args, stdin=None, multiplex=True):
+        """Run a command on host; returns (returncode, combined output, seconds)."""
+        self.hosts.add(host)
+        command = self._base(host, multiplex) + ["--", " ".join(shlex.quote(arg) for arg in remote_args)]
+        started = time.monotonic()
+        completed = subprocess.run(command, input=stdin, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        return completed.returncode, completed.stdout.decode("utf-8", "replace"), time.monotonic() - started
+
+    def close(self):
+        for host in self.hosts:
+            subprocess.run(self._base(host) + ["-O", "exit"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        shutil.rmtree(self.control_dir, ignore_errors=True)
+
+def read_inventory(path):
+    """One host ([user@]host) per line; blank lines and # comments are ignored."""
+    with open(path, encoding="utf-8") as f:
+        hosts = [line.split("#", 1)[0].strip() for line in f]
+    return [host for host in hosts if host]
+
+def rollout_waves(hosts, canary=DEFAULT_CANARY, max_wave=DEFAULT_MAX_WAVE):
+    """Split hosts into a canary wave followed by waves that double in size up to max_wave."""
+    waves, size, start = [], max(canary, 1), 0
+    while start < len(hosts):
+        waves.append(hosts[start:start + size])
+        start += size
+        size = min(size * 2, max_wave)
+    return waves
+
+def parse_sha256sum(output):
+    """{path: digest} from sha256sum output; unreadable/missing files are simply absent."""
+    digests = {}
+    for line in output.splitlines():
+        digest, sep, path = line.partition("  ")
+        if sep and len(digest) == 64:
+            digests[path] = digest
+    return digests
+
+def apply_on_host(pool, host, wave, remote_args, expected, check_only=False, become=False, python="python3"):
+    """Push this script to host over the pooled connection and run it there.
+
+    Steps: connect (opens the ControlMaster), apply (or check), and after an
+    apply a fresh non-multiplexed reconnect to prove sshd still accepts logins
+    under the new policy. A check only fetches sha256sum of the back-end files
+    and compares them to the expected (pre-rendered) digests.
+    """
+    result = {"host": host, "wave": wave, "status": "failed", "failed_step": None, "changed": [], "steps": []}
+    started = time.monotonic()
+    with open(os.path.abspath(__file__), "rb") as f:
+        script = f.read()
+    prefix = ["sudo", "-n"] if become else []
+    if check_only:
+        steps = [("connect", ["true"], None, True),
+                 ("check", prefix + ["sha256sum", "--"] + sorted(expected), None, True)]
+    else:
+        steps = [("connect", ["true"], None, True),
+                 ("apply", prefix + [python, "-"] + remote_args, script, True),
+                 ("reconnect", ["true"], None, False)]
+    for step, remote, stdin, multiplex in steps:
+        returncode, output, seconds = pool.run(host, remote, stdin=stdin, multiplex=multiplex)
+        result["steps"].append({"step": step, "returncode": returncode, "seconds": round(seconds, 3)})
+        if step == "check" and returncode in (0, 1):
+            # sha256sum exits 1 when a file is missing, which is drift rather than a failure
+            actual = parse_sha256sum(output)
+            result["changed"] = [path for path, digest in sorted(expected.items()) if actual.get(path) != digest]
+            continue
+        if step == "apply":
+            result["changed"] = [line[len("Updated: "):] for line in output.splitlines() if line.startswith("Updated: ")]
+            result["output"] = output
+        if returncode != 0:
+            result["failed_step"] = step
+            result["error"] = output.strip().splitlines()[-1] if output.strip() else f"exit {returncode}"
+            break
+    else:
+        result["status"] = ("drift" if result["changed"] else "compliant") if check_only else \
+            ("changed" if result["changed"] else "unchanged")
+    result["total_seconds"] = round(time.monotonic() - started, 3)
+    return result
+
+def run_fleet(hosts, remote_args, expected, check_only=False, canary=DEFAULT_CANARY, max_wave=DEFAULT_MAX_WAVE,
+              workers=DEFAULT_MAX_WAVE, ssh="ssh", ssh_options=(), become=False, python="python3"):
+    """Roll the policy out wave by wave (canary first), stopping after the first wave with a failure.
+    A check is read-only, so it runs over every host at once."""
+    waves = [hosts] if check_only else rollout_waves(hosts, canary, max_wave)
+    results = []
+    pool = SSHPool(ssh, ssh_options)
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for number, wave in enumerate(waves, 1):
+                print(f"Wave {number}/{len(waves)}: {len(wave)} host(s)")
+                wave_results = list(executor.map(
+                    lambda host: apply_on_host(pool, host, number, remote_args, expected, check_only, become, python), wave))
+                results.extend(wave_results)
+                for result in wave_results:
+                    print(f"  {result['host']:30} {result['status']:10} {result['total_seconds']:7.1f}s"
+                          + (f"  failed at {result['failed_step']}: {result['error']}" if result["failed_step"] else ""))
+                if any(result["status"] == "failed" for result in wave_results):
+                    remaining = [host for later in waves[number:] for host in later]
+                    if remaining:
+                        print(f"Stopping rollout: wave {number} had failures; {len(remaining)} host(s) skipped.")
+                    results.extend({"host": host, "wave": None, "status": "skipped", "failed_step": None,
+                                    "changed": [], "steps": [], "total_seconds": 0} for host in remaining)
+                    break
+    finally:
+        pool.close()
+    return results
+
+def write_fleet_report(results, report_path):
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    report = {"generated_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "summary": counts, "hosts": results}
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print("\n" + ", ".join(f"{count} {status}" for status, count in sorted(counts.items())))
+    print(f"Fleet report written to {report_path}")
+
+def cli(argv=None, prog=None):
+    """Command-line entry point; argv defaults to sys.argv[1:]. Returns the exit status."""
+    parser = argparse.ArgumentParser(prog=prog, description="Apply the SSH crypto-policy back-end files.")
+    parser.add_argument("--check", action="store_true",
+                        help="Only report files that differ from the policy; exit 1 if any do")
+    parser.add_argument("--policy", metavar="JSON", help="Policy file overriding the built-in algorithm lists")
+    parser.add_argument("--policy-json", help=argparse.SUPPRESS)  # how --policy reaches fleet hosts
+    parser.add_argument("--validate", action="store_true",
+                        help="Check the policy's algorithm names against the local `ssh -Q` output and exit")
+    parser.add_argument("--root", default="/", help="Apply under this directory instead of / (sshd is not restarted)")
+    parser.add_argument("--fleet", metavar="INVENTORY",
+                        help="Roll out to the hosts listed in INVENTORY over SSH instead of this machine")
+    parser.add_argument("--canary", type=int, default=DEFAULT_CANARY,
+                        help=f"Hosts in the first wave (default: {DEFAULT_CANARY})")
+    parser.add_argument("--max-wave", type=int, default=DEFAULT_MAX_WAVE,
+                        help=f"Largest wave; waves double after the canary (default: {DEFAULT_MAX_WAVE})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WAVE,
+                        help=f"Concurrent SSH sessions (default: {DEFAULT_MAX_WAVE})")
+    parser.add_argument("--ssh", default="ssh", help="SSH client to use (default: ssh)")
+    parser.add_argument("--ssh-option", action="append", default=[], metavar="OPT",
+                        help="Extra ssh -o option, e.g. Port=2222 (repeatable)")
+    parser.add_argument("--become", action="store_true", help="Run the remote side with sudo -n")
+    parser.add_argument("--remote-python", default="python3", help="Python on the remote hosts (default: python3)")
+    parser.add_argument("--report", default=f"crypto-policy-rollout-{time.strftime('%Y%m%d-%H%M%S')}.json",
+                        help="Where to write the fleet report")
+    args = parser.parse_args(argv)
+
+    try:
+        policy = load_policy(args.policy) if args.policy else \
+            dict(POLICY, **json.loads(args.policy_json)) if args.policy_json else POLICY
+    except (OSError, ValueError) as e:
+        print(f"Error loading policy: {e}")
+        return 2
+
+    if args.validate:
+        problems = validate_policy(policy, args.ssh)
+        for key, names in problems.items():
+            print(f"Unknown {key}: {', '.join(names)}")
+        print("Policy is valid for the local OpenSSH." if not problems else "Policy has unknown algorithms.")
+        return 1 if problems else 0
+
+    rendered, digests = render_policy(policy)
+    if args.fleet:
+        remote_args = ["--root", args.root]
+        if policy is not POLICY:
+            remote_args += ["--policy-json", json.dumps(policy, separators=(",", ":"))]
+        ssh_options = [arg for option in args.ssh_option for arg in ("-o", option)]
+        results = run_fleet(read_inventory(args.fleet), remote_args, rooted(digests, args.root), args.check,
+                            args.canary, args.max_wave, args.workers, args.ssh, ssh_options, args.become,
+                            args.remote_python)
+        write_fleet_report(results, args.report)
+        return 1 if any(result["status"] in ("failed", "skipped", "drift") for result in results) else 0
+
+    files = rooted(rendered, args.root)
+    changed = apply_policy(files, check_only=args.check)
+    if args.check:
+        print(f"{len(changed)} of {len(files)} files drifted from the policy.")
+        return 1 if changed else 0
+    if args.root in ("", "/"):
+        restart_sshd_if_needed(changed)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(cli())
@@ -1,89 +1,290 @@
+import argparse
+import ast
+import glob
+import json
 import os
+import shutil
+import statistics
 import subprocess
+import sys
+import time
 
-def install_pyinstaller():
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+WHEELHOUSE = os.path.expanduser("~/.cache/pyinstaller-wheelhouse")
+BUILD_CACHE = os.path.expanduser("~/.cache/pyinstaller-build")
+APT_CACHE_MAX_AGE = 6 * 3600  # skip `apt-get update` if the lists are newer than this
+PIP_PACKAGES = ["wheel", "pyinstaller"]
+
+DEBIAN_PACKAGES = ["python3", "python3-pip"]
+# gcc replaces the old separate "Development Tools" groupinstall; it is all PyInstaller needs
+REDHAT_PACKAGES = ["python3", "python3-pip", "gcc"]
+
+# Stdlib modules none of the bundled scripts use; tkinter is added per script
+# unless the script imports it.
+EXCLUDED_MODULES = ["unittest", "pydoc", "doctest", "test", "lib2to3", "idlelib", "turtledemo",
+                    "ensurepip", "xmlrpc", "pdb"]
+
+def detect_distro():
+    distro = ""
+    with open("/etc/os-release") as f:
+        for line in f:
+            if line.startswith("ID="):
+                distro = line.strip().split("=")[1].lower().replace('"', '')
+    if not distro:
+        raise ValueError("Unable to determine Linux distribution")
+    return distro
+
+def pyinstaller_version():
+    """Installed PyInstaller version, or None."""
     try:
-        # Step 1: Check the Linux distribution
-        distro = ""
-        with open("/etc/os-release") as f:
-            for line in f:
-                if line.startswith("ID="):
-                    distro = line.strip().split("=")[1].lower().replace('"', '')
+        completed = subprocess.run([sys.executable, "-m", "PyInstaller", "--version"],
+                                   capture_output=True, universal_newlines=True)
+    except OSError:
+        return None
+    return completed.stdout.strip() if completed.returncode == 0 else None
 
-        if not distro:
-            raise ValueError("Unable to determine Linux distribution")
+def missing_packages(distro, packages):
+    """Packages not yet installed, checked in one dpkg/rpm query."""
+    if distro in ["ubuntu", "debian"]:
+        completed = subprocess.run(["dpkg-query", "-W", "-f", "${Package} ${Status}\n"] + packages,
+                                   capture_output=True, universal_newlines=True)
+        installed = {line.split()[0] for line in completed.stdout.splitlines() if line.endswith("install ok installed")}
+    else:
+        # rpm prints "package <name> is not installed" on stdout for missing ones,
+        # so only count lines that are exactly a requested name.
+        completed = subprocess.run(["rpm", "-q", "--qf", "%{NAME}\n"] + packages,
+                                   capture_output=True, universal_newlines=True)
+        installed = {line.strip() for line in completed.stdout.splitlines()} & set(packages)
+    return [package for package in packages if package not in installed]
 
-        print(f"Detected Linux distribution: {distro}")
+def apt_cache_is_fresh(max_age=APT_CACHE_MAX_AGE):
+    """True if the package lists were fetched within max_age. Only the downloaded Release
+    files (and Ubuntu's update-success stamp) count: pkgcache.bin is rebuilt by any dpkg
+    change, and the lists directory is new on images that emptied it. No lists means stale."""
+    releases = glob.glob("/var/lib/apt/lists/*_InRelease") + glob.glob("/var/lib/apt/lists/*_Release")
+    if not releases:
+        return False
+    stamps = releases + [path for path in ["/var/lib/apt/periodic/update-success-stamp"] if os.path.exists(path)]
+    return time.time() - max(os.path.getmtime(path) for path in stamps) < max_age
 
-        # Step 2: Install Python, pip, and necessary packages based on the distro
-        if distro in ["ubuntu", "debian"]:
-            print("Updating package list and installing Python and pip on Debian-based system...")
-            subprocess.run(
-                ["sudo", "DEBIAN_FRONTEND=noninteractive", "apt-get", "update"], check=True
-            )
-            subprocess.run(
-                ["sudo", "DEBIAN_FRONTEND=noninteractive", "apt-get", "install", "-y", "python3", "python3-pip"], check=True
-            )
-        elif distro in ["rhel", "centos", "fedora"]:
-            print("Updating package list and installing Python and pip on Red Hat-based system...")
-            subprocess.run(
-                ["sudo", "yum", "install", "-y", "python3", "python3-pip"], check=True
-            )
-
-            # Step 3: Check if GCC (C compiler) is installed (this part is for Red Hat)
-            print("Checking if GCC is installed...")
-            try:
-                subprocess.run(["gcc", "--version"], check=True)
-                print("GCC is already installed.")
-            except FileNotFoundError:
-                print("GCC not found. Installing development tools (including GCC)...")
-                subprocess.run(["sudo", "yum", "groupinstall", "-y", "Development Tools"], check=True)
+def apt_update():
+    print("Updating package list...")
+    subprocess.run(["sudo", "DEBIAN_FRONTEND=noninteractive", "apt-get", "update"], check=True)
 
+def install_system_packages(distro):
+    """Install whatever system packages are missing in a single package-manager transaction."""
+    if distro in ["ubuntu", "debian"]:
+        missing = missing_packages(distro, DEBIAN_PACKAGES)
+        if not missing:
+            print("Python and pip are already installed.")
+            return
+        skipped_update = apt_cache_is_fresh()
+        if skipped_update:
+            print("Package lists are recent; skipping apt-get update.")
         else:
-            raise ValueError(f"Unsupported distribution: {distro}")
-
-        # Step 4: Install wheel (required for building PyInstaller)
-        print("Installing the wheel package...")
-        subprocess.run(["pip3", "install", "--user", "wheel"], check=True)
-
-        # Step 5: Install PyInstaller using pip
-        print("Installing PyInstaller...")
-        subprocess.run(["pip3", "install", "--user", "pyinstaller"], check=True)
-
-        # Step 6: Handle PATH separately for Ubuntu/Debian and Red Hat
-        local_bin_path = os.path.expanduser("~/.local/bin")
-
-        if distro in ["ubuntu", "debian"]:
-            # Ubuntu/Debian specific handling of the PATH
-            if local_bin_path not in os.environ["PATH"]:
-                print(f"Adding {local_bin_path} to PATH for Ubuntu/Debian...")
-                with open(os.path.expanduser("~/.bashrc"), "a") as bashrc:
-                    bashrc.write(f'\nexport PATH="{local_bin_path}:$PATH"\n')
-                os.environ["PATH"] += os.pathsep + local_bin_path
-                # Display command for the user to run
-                print("\nPlease run the following command to apply the PATH changes:")
-                print("\n    source ~/.bashrc\n")
-
-        elif distro in ["rhel", "centos", "fedora"]:
-            # Keep Red Hat settings as fixed previously
-            if local_bin_path not in os.environ["PATH"]:
-                print(f"Adding {local_bin_path} to PATH for Red Hat...")
-                with open(os.path.expanduser("~/.bashrc"), "a") as bashrc:
-                    bashrc.write(f'\nexport PATH="{local_bin_path}:$PATH"\n')
-                os.environ["PATH"] += os.pathsep + local_bin_path
-                # Reload .bashrc for current session
-                subprocess.run(["source ~/.bashrc"], shell=True)
-
-        # Step 7: Verify PyInstaller installation
+            apt_update()
+        print(f"Installing {' '.join(missing)} on Debian-based system...")
+        install = ["sudo", "DEBIAN_FRONTEND=noninteractive", "apt-get", "install", "-y", "--no-install-recommends"]
+        completed = subprocess.run(install + missing)
+        if completed.returncode != 0:
+            if not skipped_update:
+                raise subprocess.CalledProcessError(completed.returncode, install + missing)
+            # The lists looked recent but may still be stale (e.g. a mirror rotated packages)
+            print("Install failed; updating package lists and retrying once...")
+            apt_update()
+            subprocess.run(install + missing, check=True)
+    elif distro in ["rhel", "centos", "fedora"]:
+        missing = missing_packages(distro, REDHAT_PACKAGES)
+        if not missing:
+            print("Python, pip and GCC are already installed.")
+            return
+        manager = "dnf" if shutil.which("dnf") else "yum"
+        print(f"Installing {' '.join(missing)} on Red Hat-based system...")
+        subprocess.run(["sudo", manager, "install", "-y"] + missing, check=True)
+    else:
+        raise ValueError(f"Unsupported distribution: {distro}")
+
+def install_python_packages(requirements, wheelhouse=WHEELHOUSE, offline=False):
+    """One pip resolve from the local wheelhouse; the wheelhouse is filled from PyPI only when
+    it can't satisfy the requirements (never with offline)."""
+    install = [sys.executable, "-m", "pip", "install", "--user", "--no-index", "--find-links", wheelhouse] + requirements
+    os.makedirs(wheelhouse, exist_ok=True)
+    if subprocess.run(install).returncode == 0:
+        return
+    if offline:
+        raise RuntimeError(f"{wheelhouse} can't satisfy {' '.join(requirements)} and --offline was given")
+    print(f"Filling wheelhouse {wheelhouse}...")
+    subprocess.run([sys.executable, "-m", "pip", "wheel", "--wheel-dir", wheelhouse] + requirements, check=True)
+    subprocess.run(install, check=True)
+
+def ensure_local_bin_on_path():
+    local_bin_path = os.path.expanduser("~/.local/bin")
+    if local_bin_path in os.environ["PATH"].split(os.pathsep):
+        return
+    os.environ["PATH"] += os.pathsep + local_bin_path
+    bashrc_path = os.path.expanduser("~/.bashrc")
+    line = f'export PATH="{local_bin_path}:$PATH"'
+    if os.path.exists(bashrc_path):
+        with open(bashrc_path) as bashrc:
+            if line in bashrc.read():
+                return
+    print(f"Adding {local_bin_path} to PATH in ~/.bashrc...")
+    with open(bashrc_path, "a") as bashrc:
+        bashrc.write(f'\n{line}\n')
+    # A child shell can't change this shell's environment, so ask the user instead
+    print("\nPlease run the following command to apply the PATH changes:")
+    print("\n    source ~/.bashrc\n")
+
+def install_pyinstaller(version=None, wheelhouse=WHEELHOUSE, offline=False, force=False):
+    try:
+        # Step 1: Nothing to do if the right PyInstaller is already there
+        installed = pyinstaller_version()
+        if installed and not force and (version is None or installed == version):
+            print(f"PyInstaller {installed} is already installed.")
+            return True
+
+        # Step 2: Check the Linux distribution and install missing system packages in one transaction
+        distro = detect_distro()
+        print(f"Detected Linux distribution: {distro}")
+        install_system_packages(distro)
+
+        # Step 3: Install wheel and PyInstaller in one pip resolve from the wheelhouse
+        print("Installing wheel and PyInstaller...")
+        requirements = [f"pyinstaller=={version}" if package == "pyinstaller" and version else package
+                        for package in PIP_PACKAGES]
+        install_python_packages(requirements, wheelhouse, offline)
+
+        # Step 4: Make ~/.local/bin available
+        ensure_local_bin_on_path()
+
+        # Step 5: Verify PyInstaller installation
         print("Verifying PyInstaller installation...")
-        subprocess.run(["pyinstaller", "--version"], check=True)
+        print(f"PyInstaller {pyinstaller_version()} installed successfully!")
+        return True
 
-        print("PyInstaller installed successfully!")
-    
     except subprocess.CalledProcessError as e:
         print(f"An error occurred during installation: {e}")
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
+    return False
+
+def bundle_scripts():
+    """The repo's Python tools: every top-level script except this installer, benchmarks and the
+    subcommand dispatcher (which loads its sibling scripts by path, so it can't be bundled alone)."""
+    return sorted(path for path in glob.glob(os.path.join(SCRIPT_DIR, "*.py"))
+                  if os.path.abspath(path) != os.path.abspath(__file__)
+                  and not path.endswith(("-benchmark.py", "-cli.py")))
+
+def bundle_name(script):
+    return os.path.splitext(os.path.basename(script))[0]
+
+def imported_modules(script):
+    """Top-level names of every module the script imports, including lazy imports inside functions."""
+    with open(script, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), script)
+    modules = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.add(node.module.split(".")[0])
+    return modules
+
+def excluded_modules(script):
+    used = imported_modules(script)
+    excluded = [module for module in EXCLUDED_MODULES if module not in used]
+    if "tkinter" not in used:
+        excluded += ["tkinter", "_tkinter"]
+    return excluded
+
+def build_bundle(script, mode, dist_dir, cache_dir=BUILD_CACHE):
+    """Build one onedir or onefile bundle. Work files, specs and PyInstaller's own cache live in
+    cache_dir and are reused across builds (no --clean), so rebuilds only redo what changed."""
+    name = bundle_name(script)
+    command = [sys.executable, "-m", "PyInstaller", "--noconfirm", "--log-level", "WARN", f"--{mode}",
+               "--name", name,
+               "--distpath", os.path.join(dist_dir, mode),
+               "--workpath", os.path.join(cache_dir, "work", mode),
+               "--specpath", os.path.join(cache_dir, "spec", mode)]
+    for module in excluded_modules(script):
+        command += ["--exclude-module", module]
+    env = dict(os.environ, PYINSTALLER_CONFIG_DIR=os.path.join(cache_dir, "config"))
+    started = time.monotonic()
+    subprocess.run(command + [script], check=True, env=env)
+    seconds = time.monotonic() - started
+    executable = os.path.join(dist_dir, mode, name, name) if mode == "onedir" else os.path.join(dist_dir, mode, name)
+    print(f"Built {mode:7} {name} in {seconds:.1f}s -> {executable}")
+    return executable, seconds
+
+def drop_page_cache():
+    """Drop the page cache so the next launch reads the bundle from disk; needs root."""
+    try:
+        os.sync()
+        with open("/proc/sys/vm/drop_caches", "w") as f:
+            f.write("3\n")
+        return True
+    except OSError:
+        return False
+
+def time_launch(executable, args=("--help",)):
+    started = time.monotonic()
+    subprocess.run([executable] + list(args), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.monotonic() - started
+
+def benchmark_bundle(executable, runs=5):
+    """Cold start (page cache dropped when possible, else the first launch after the build)
+    and the median of warm starts, in seconds."""
+    dropped = drop_page_cache()
+    cold = time_launch(executable)
+    warm = [time_launch(executable) for _ in range(runs)]
+    return {"cold_seconds": round(cold, 3), "warm_median_seconds": round(statistics.median(warm), 3),
+            "warm_min_seconds": round(min(warm), 3), "page_cache_dropped": dropped}
+
+def build_and_benchmark(scripts, modes, dist_dir, runs, report_path=None):
+    results = []
+    for script in scripts:
+        for mode in modes:
+            executable, build_seconds = build_bundle(script, mode, dist_dir)
+            result = {"script": os.path.basename(script), "mode": mode, "executable": executable,
+                      "build_seconds": round(build_seconds, 1)}
+            if runs:
+                result.update(benchmark_bundle(executable, runs))
+            results.append(result)
+
+    if runs:
+        print(f"\n{'bundle':34} {'mode':8} {'cold':>8} {'warm':>8}")
+        for result in results:
+            print(f"{bundle_name(result['script']):34} {result['mode']:8} "
+                  f"{result['cold_seconds']:7.2f}s {result['warm_median_seconds']:7.2f}s")
+        if not all(result["page_cache_dropped"] for result in results):
+            print("(not root: cold times are first launches without dropping the page cache)")
+    if report_path:
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Report written to {report_path}")
+    return results
+
+def cli(argv=None, prog=None):
+    """Command-line entry point; argv defaults to sys.argv[1:]."""
+    parser = argparse.ArgumentParser(prog=prog, description="Install PyInstaller, and optionally bundle the repo's scripts.")
+    parser.add_argument("--version", help="Install this PyInstaller version (default: any)")
+    parser.add_argument("--wheelhouse", default=WHEELHOUSE, help=f"Local wheel cache (default: {WHEELHOUSE})")
+    parser.add_argument("--offline", action="store_true", help="Install only from the wheelhouse")
+    parser.add_argument("--force", action="store_true", help="Reinstall even if PyInstaller is present")
+    parser.add_argument("--build", nargs="*", metavar="SCRIPT",
+                        help="Bundle these scripts (default: all of the repo's Python tools)")
+    parser.add_argument("--mode", choices=["onedir", "onefile", "both"], default="onedir",
+                        help="Bundle layout (default: onedir, which avoids unpacking on every launch)")
+    parser.add_argument("--dist", default=os.path.join(SCRIPT_DIR, "dist"), help="Where bundles are written")
+    parser.add_argument("--benchmark", type=int, nargs="?", const=5, default=0, metavar="RUNS",
+                        help="Time cold and warm startup of each bundle (default runs: 5)")
+    parser.add_argument("--report", help="Write build and startup timings as JSON")
+    args = parser.parse_args(argv)
+
+    if install_pyinstaller(args.version, args.wheelhouse, args.offline, args.force) and args.build is not None:
+        modes = ["onedir", "onefile"] if args.mode == "both" else [args.mode]
+        scripts = [os.path.abspath(script) for script in args.build] or bundle_scripts()
+        build_and_benchmark(scripts, modes, args.dist, args.benchmark, args.report)
 
 if __name__ == "__main__":
-    install_pyinstaller()
+    cli()
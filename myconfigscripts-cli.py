@@ -0,0 +1,124 @@
+import argparse
+import importlib.util
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Subcommand -> (script, help). Each script exposes cli(argv, prog) and has no side effects on
+# import; a script (and whatever it imports, e.g. requests or PIL) is only loaded when its
+# subcommand runs.
+TOOLS = {
+    "repo-download": ("Downlaod-Files-From-Repo.py", "Download or sync files from a GitHub repository"),
+    "dns": ("add-remove-dnsrecord-cloudflare.py", "Manage Cloudflare DNS records"),
+    "webp": ("WEBP-TO-PNG.py", "Convert WebP images to PNG"),
+    "lvm-recover": ("Recover-LVM-OS-Disk.py", "Recover LVM-based OS disks attached to a rescue VM"),
+    "crypto-policy": ("crypto-polices-update.py", "Apply the SSH crypto-policy back-end files"),
+    "pyinstaller": ("install-pyinstaller-on-any-linux.py", "Install PyInstaller and bundle the scripts"),
+    "tf-setup": ("terraform-project-setup.py", "Scaffold Terraform projects"),
+}
+
+def module_name(command):
+    return command.replace("-", "_")
+
+def load_tool(command):
+    """Import a tool's script by path (the file names aren't valid module names) and return the module.
+
+    The module is registered in sys.modules so worker processes can unpickle its functions.
+    """
+    name = module_name(command)
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, os.path.join(SCRIPT_DIR, TOOLS[command][0]))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+def run(command, argv, prog=None):
+    """Run a subcommand's CLI with argv; returns its exit status."""
+    try:
+        status = load_tool(command).cli(argv, prog=f"{prog or 'myconfigscripts'} {command}")
+    except SystemExit as e:
+        status = e.code
+    return status or 0
+
+def _import_cost(command=None):
+    """Import a tool in a fresh interpreter under -X importtime.
+
+    Returns (wall ms for loading the tool, {top-level module: cumulative ms}); with no
+    command, just the interpreter's own startup imports.
+    """
+    import subprocess
+
+    code = "import time\n"
+    if command:
+        code += ("import importlib.util\n"
+                 f"spec = importlib.util.spec_from_file_location({module_name(command)!r}, "
+                 f"{os.path.join(SCRIPT_DIR, TOOLS[command][0])!r})\n"
+                 "module = importlib.util.module_from_spec(spec)\n"
+                 "started = time.perf_counter()\n"
+                 "spec.loader.exec_module(module)\n"
+                 "print((time.perf_counter() - started) * 1000)\n")
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                               capture_output=True, universal_newlines=True)
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "import failed")
+    modules = {}
+    for line in completed.stderr.splitlines():
+        # "import time:   self [us] | cumulative | imported package"; nested imports are indented
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, package = line[len("import time:"):].split("|")
+        if not package.startswith("  "):
+            modules[package.strip()] = int(cumulative) / 1000
+    return (float(completed.stdout) if command else 0.0), modules
+
+def measure_import_times(commands=None, budget_ms=None):
+    """Print each tool's import cost beyond interpreter startup. Returns the tools over budget_ms."""
+    _, baseline = _import_cost()
+    over_budget = []
+    print(f"{'subcommand':15} {'import ms':>10}  heaviest imports")
+    for command in commands or TOOLS:
+        try:
+            wall_ms, modules = _import_cost(command)
+        except RuntimeError as e:
+            print(f"{command:15} {'failed':>10}  {e}")
+            over_budget.append(command)
+            continue
+        extra = sorted(((ms, name) for name, ms in modules.items() if name not in baseline), reverse=True)
+        heaviest = ", ".join(f"{name} {ms:.1f}" for ms, name in extra[:3])
+        flag = ""
+        if budget_ms is not None and wall_ms > budget_ms:
+            over_budget.append(command)
+            flag = "  OVER BUDGET"
+        print(f"{command:15} {wall_ms:10.1f}  {heaviest}{flag}")
+    return over_budget
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="myconfigscripts",
+        description="Run any of the repository's Python tools as a subcommand.",
+        epilog="Subcommands:\n" + "\n".join(f"  {command:15} {help_text}" for command, (_, help_text) in TOOLS.items()),
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--importtime", nargs="*", choices=list(TOOLS), metavar="SUBCOMMAND",
+                        help="Measure each subcommand's import cost with python -X importtime and exit")
+    parser.add_argument("--budget-ms", type=float,
+                        help="With --importtime, exit 1 if any subcommand takes longer than this to import")
+    parser.add_argument("command", nargs="?", choices=list(TOOLS), metavar="SUBCOMMAND")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="Arguments for the subcommand (see SUBCOMMAND --help)")
+    args = parser.parse_args(argv)
+
+    if args.importtime is not None:
+        return 1 if measure_import_times(args.importtime, args.budget_ms) else 0
+    if not args.command:
+        parser.print_help()
+        return 2
+    return run(args.command, args.args, parser.prog)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,25 +1,89 @@
+import argparse
+import hashlib
+import json
 import os
+import shutil
 import subprocess
 import platform
+import re
 import sys
-
-def is_terraform_installed():
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from string import Template
+
+TERRAFORM_DIR = os.path.expanduser("~/.terraform.d")
+PLUGIN_CACHE_DIR = os.path.join(TERRAFORM_DIR, "plugin-cache")
+PROVIDER_MIRROR_DIR = os.path.join(TERRAFORM_DIR, "provider-mirror")
+LOCK_CACHE_DIR = os.path.join(TERRAFORM_DIR, "lock-files")
+CLI_CONFIG_FILE = os.path.join(TERRAFORM_DIR, "project-setup.tfrc")
+LOCK_FILE = ".terraform.lock.hcl"
+DEFAULT_INIT_WORKERS = 4
+
+TERRAFORM_VERSION = "1.6.0"
+RELEASES_URL = "https://releases.hashicorp.com/terraform"
+VERSIONS_DIR = os.path.join(TERRAFORM_DIR, "versions")
+# Used when the command is linked into a system bin dir: a link into root's home
+# (usually mode 0700) would leave terraform unusable for every other user.
+SYSTEM_VERSIONS_DIR = "/opt/terraform/versions"
+VERSION_CACHE_FILE = os.path.join(TERRAFORM_DIR, "version-cache.json")
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+SPOOL_MAX_SIZE = 128 * 1024 * 1024  # Terraform zips are ~25 MB, so they normally never touch disk
+
+# Cloud platform -> (provider local name, registry source, version constraint), as used in the templates
+PROVIDERS = {
+    "aws": ("aws", "hashicorp/aws", ">= 3.0.0"),
+    "azure": ("azurerm", "hashicorp/azurerm", ">= 2.0.0"),
+    "digitalocean": ("digitalocean", "digitalocean/digitalocean", ">= 2.0.0"),
+    "linode": ("linode", "linode/linode", ">= 1.16.0"),
+}
+
+def _load_version_cache():
+    try:
+        with open(VERSION_CACHE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def terraform_version(binary):
+    """Version of a terraform binary. Cached by path, size and mtime, so `terraform version`
+    only runs once per binary; binaries in our versions cache are known by their path."""
+    real = os.path.realpath(binary)
+    if os.path.dirname(os.path.dirname(real)) in (os.path.realpath(VERSIONS_DIR), os.path.realpath(SYSTEM_VERSIONS_DIR)):
+        return os.path.basename(os.path.dirname(real))
+    st = os.stat(real)
+    cache = _load_version_cache()
+    entry = cache.get(real)
+    if entry and entry["size"] == st.st_size and entry["mtime"] == st.st_mtime:
+        return entry["version"]
+    completed = subprocess.run([real, "version", "-json"], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    if completed.returncode != 0:
+        return None
     try:
-        subprocess.run(["terraform", "version"], stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
-        print("Terraform CLI is already installed.")
+        version = json.loads(completed.stdout)["terraform_version"]
+    except (ValueError, KeyError):
+        version = completed.stdout.split()[1].lstrip("v")  # "Terraform v1.6.0" on versions without -json
+    cache[real] = {"size": st.st_size, "mtime": st.st_mtime, "version": version}
+    os.makedirs(TERRAFORM_DIR, exist_ok=True)
+    with open(VERSION_CACHE_FILE, "w") as f:
+        json.dump(cache, f, indent=2)
+    return version
+
+def is_terraform_installed(version=None):
+    binary = shutil.which("terraform")
+    installed = terraform_version(binary) if binary else None
+    if installed and (version is None or installed == version):
+        print(f"Terraform CLI {installed} is already installed.")
         return True
-    except subprocess.CalledProcessError:
-        return False
-    except FileNotFoundError:
-        return False
+    return False
 
 def install_terraform():
     os_type = platform.system().lower()
 
     if os_type == "windows":
         print("Downloading and installing Terraform for Windows...")
-        url = "https://releases.hashicorp.com/terraform/1.6.0/terraform_1.6.0_windows_amd64.zip"
-        download_and_install_terraform(url, "windows")
+        download_and_install_terraform(TERRAFORM_VERSION, "windows")
 
     elif os_type == "linux":
         distro = subprocess.run(["lsb_release", "-is"], stdout=subprocess.PIPE, text=True).stdout.strip().lower()
@@ -64,31 +128,92 @@ def install_terraform():
 
     print("Terraform has been successfully installed.")
 
-def download_and_install_terraform(url, os_type):
-    import zipfile
-    import urllib.request
-    import shutil
+def release_arch():
+    machine = platform.machine().lower()
+    return {"x86_64": "amd64", "amd64": "amd64", "aarch64": "arm64", "arm64": "arm64"}.get(machine, machine)
 
-    terraform_zip = "terraform.zip"
-    terraform_dir = os.path.join(os.getcwd(), "terraform")
+def versions_dir(bin_dir=None):
+    """Versions cache for a bin dir: per-user for a bin dir in $HOME, otherwise system-wide."""
+    if bin_dir and os.path.realpath(bin_dir).startswith(os.path.realpath(os.path.expanduser("~")) + os.sep):
+        return VERSIONS_DIR
+    return VERSIONS_DIR if platform.system().lower() == "windows" else SYSTEM_VERSIONS_DIR
 
-    urllib.request.urlretrieve(url, terraform_zip)
-    
-    with zipfile.ZipFile(terraform_zip, 'r') as zip_ref:
-        zip_ref.extractall(terraform_dir)
+def cached_binary(version, os_type, cache_dir=VERSIONS_DIR):
+    return os.path.join(cache_dir, version, "terraform.exe" if os_type == "windows" else "terraform")
 
-    terraform_binary = os.path.join(terraform_dir, "terraform.exe" if os_type == "windows" else "terraform")
+def expected_sha256(version, zip_name):
+    """The zip's checksum from the release's SHA256SUMS file."""
+    import urllib.request
+
+    with urllib.request.urlopen(f"{RELEASES_URL}/{version}/terraform_{version}_SHA256SUMS") as response:
+        for line in response.read().decode().splitlines():
+            digest, _, name = line.partition("  ")
+            if name.strip() == zip_name:
+                return digest
+    raise ValueError(f"{zip_name} is not listed in the SHA256SUMS for Terraform {version}")
+
+def fetch_terraform(version, os_type, cache_dir=VERSIONS_DIR):
+    """Download a release into the versions cache unless it is already there, and return the
+    binary's path. The zip is hashed as it streams into a spooled buffer and checked against
+    SHA256SUMS; the binary member is then streamed straight into place, nothing else extracted."""
+    import urllib.request
+    import zipfile
+
+    binary = cached_binary(version, os_type, cache_dir)
+    if os.path.exists(binary):
+        print(f"Using cached Terraform {version}.")
+        return binary
+
+    zip_name = f"terraform_{version}_{os_type}_{release_arch()}.zip"
+    expected = expected_sha256(version, zip_name)
+    os.makedirs(os.path.dirname(binary), exist_ok=True)
+    if cache_dir != VERSIONS_DIR:
+        # Readable by everyone whatever root's umask is
+        for path in (os.path.dirname(cache_dir), cache_dir, os.path.dirname(binary)):
+            os.chmod(path, 0o755)
+    print(f"Downloading {zip_name}...")
+    sha256 = hashlib.sha256()
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE, dir=os.path.dirname(binary)) as spool:
+        with urllib.request.urlopen(f"{RELEASES_URL}/{version}/{zip_name}") as response:
+            for chunk in iter(lambda: response.read(DOWNLOAD_CHUNK_SIZE), b""):
+                sha256.update(chunk)
+                spool.write(chunk)
+        if sha256.hexdigest() != expected:
+            raise ValueError(f"Checksum mismatch for {zip_name}: expected {expected}, got {sha256.hexdigest()}")
+
+        spool.seek(0)
+        part_path = binary + ".part"
+        with zipfile.ZipFile(spool) as archive, archive.open(os.path.basename(binary)) as member, \
+                open(part_path, "wb") as f:
+            shutil.copyfileobj(member, f, DOWNLOAD_CHUNK_SIZE)
+    os.chmod(part_path, 0o755)
+    os.replace(part_path, binary)
+    print(f"Verified and cached Terraform {version} at {binary}")
+    return binary
+
+def download_and_install_terraform(version, os_type, bin_dir=None):
+    """Install a Terraform version from the verified versions cache. On Linux/macOS the command
+    is a symlink into the cache, so switching between cached versions is just relinking; a
+    system bin dir links into the system-wide cache so every user can run it."""
+    binary = fetch_terraform(version, os_type, versions_dir(bin_dir))
 
     if os_type == "windows":
         destination = os.path.join(os.environ['WINDIR'], 'System32', 'terraform.exe')
+        shutil.copy2(binary, destination)
     else:
-        destination = "/usr/local/bin/terraform"
-
-    shutil.move(terraform_binary, destination)
-    print(f"Terraform installed at {destination}")
-
-    os.remove(terraform_zip)
-    shutil.rmtree(terraform_dir)
+        destination = os.path.join(bin_dir or "/usr/local/bin", "terraform")
+        link = destination + ".new"
+        if os.path.lexists(link):
+            os.remove(link)
+        os.symlink(binary, link)
+        os.replace(link, destination)
+    print(f"Terraform {version} installed at {destination}")
+
+def cached_versions(cache_dir=VERSIONS_DIR):
+    if not os.path.isdir(cache_dir):
+        return []
+    return sorted(version for version in os.listdir(cache_dir)
+                  if os.path.exists(cached_binary(version, platform.system().lower(), cache_dir)))
 
 def create_folder(destination):
     try:
@@ -97,118 +222,240 @@ def create_folder(destination):
             print(f"Created folder at {destination}")
         else:
             print(f"Folder already exists at {destination}")
+        return True
     except Exception as e:
         print(f"Error creating folder: {e}")
+        return False
 
-def write_terraform_config(cloud_platform, destination, config_params):
-    terraform_template = {
-        "aws": f"""
-terraform {{
-  required_providers {{
-    aws = {{
+# main.tf templates, compiled once at import rather than rebuilt for every project
+TERRAFORM_TEMPLATES = {
+    "aws": Template("""
+terraform {
+  required_providers {
+    aws = {
       source = "hashicorp/aws"
       version = ">= 3.0.0"
-    }}
-  }}
-}}
+    }
+  }
+}
 
-provider "aws" {{
-  access_key = "{config_params.get('aws_access_key', '')}"
-  secret_key = "{config_params.get('aws_secret_key', '')}"
+provider "aws" {
+  access_key = "$aws_access_key"
+  secret_key = "$aws_secret_key"
   region     = "us-west-2"
-}}
+}
 
-resource "aws_instance" "example" {{
+resource "aws_instance" "example" {
   ami           = "ami-0c55b159cbfafe1f0"
   instance_type = "t2.micro"
-}}
-""",
-        "azure": f"""
-terraform {{
-  required_providers {{
-    azurerm = {{
+}
+"""),
+    "azure": Template("""
+terraform {
+  required_providers {
+    azurerm = {
       source = "hashicorp/azurerm"
       version = ">= 2.0.0"
-    }}
-  }}
-}}
-
-provider "azurerm" {{
-  subscription_id = "{config_params.get('azure_subscription_id', '')}"
-  client_id       = "{config_params.get('azure_client_id', '')}"
-  client_secret   = "{config_params.get('azure_client_secret', '')}"
-  tenant_id       = "{config_params.get('azure_tenant_id', '')}"
-  features        {{}}
-}}
-
-resource "azurerm_resource_group" "example" {{
+    }
+  }
+}
+
+provider "azurerm" {
+  subscription_id = "$azure_subscription_id"
+  client_id       = "$azure_client_id"
+  client_secret   = "$azure_client_secret"
+  tenant_id       = "$azure_tenant_id"
+  features        {}
+}
+
+resource "azurerm_resource_group" "example" {
   name     = "example-resources"
   location = "West Europe"
-}}
-""",
-        "digitalocean": f"""
-terraform {{
-  required_providers {{
-    digitalocean = {{
+}
+"""),
+    "digitalocean": Template("""
+terraform {
+  required_providers {
+    digitalocean = {
       source = "digitalocean/digitalocean"
       version = ">= 2.0.0"
-    }}
-  }}
-}}
+    }
+  }
+}
 
-provider "digitalocean" {{
-  token = "{config_params.get('do_token', '')}"
-}}
+provider "digitalocean" {
+  token = "$do_token"
+}
 
-resource "digitalocean_droplet" "example" {{
+resource "digitalocean_droplet" "example" {
   image  = "ubuntu-20-04-x64"
   name   = "example-droplet"
   region = "nyc1"
   size   = "s-1vcpu-1gb"
-}}
-""",
-        "linode": f"""
-terraform {{
-  required_providers {{
-    linode = {{
+}
+"""),
+    "linode": Template("""
+terraform {
+  required_providers {
+    linode = {
       source = "linode/linode"
       version = ">= 1.16.0"
-    }}
-  }}
-}}
+    }
+  }
+}
 
-provider "linode" {{
-  token = "{config_params.get('linode_token', '')}"
-}}
+provider "linode" {
+  token = "$linode_token"
+}
 
-resource "linode_instance" "example" {{
+resource "linode_instance" "example" {
   image   = "linode/ubuntu22.04"
   region  = "us-east"
   type    = "g6-nanode-1"
   label   = "example-instance"
-}}
-"""
-    }
-    
+}
+"""),
+}
+
+def render_terraform_config(cloud_platform, config_params):
+    """main.tf for a platform from the precompiled template, or "" if the platform isn't supported."""
+    template = TERRAFORM_TEMPLATES.get(cloud_platform.lower())
+    if template is None:
+        return ""
+    # Placeholders without a value render as empty strings, as with the old config_params.get(key, '')
+    return template.substitute(defaultdict(str, config_params))
+
+def write_terraform_config(cloud_platform, destination, config_params):
     try:
-        config = terraform_template.get(cloud_platform.lower(), "")
+        config = render_terraform_config(cloud_platform, config_params)
         if config:
             config_path = os.path.join(destination, "main.tf")
             with open(config_path, 'w') as f:
                 f.write(config)
             print(f"Terraform config written to {config_path}")
+            return True
         else:
             print(f"Cloud platform '{cloud_platform}' not supported.")
     except Exception as e:
         print(f"Error writing config: {e}")
+    return False
+
+def seed_lock_file(destination, cloud_platform):
+    """Start from the cached, pinned lock file so init takes the provider straight from the cache."""
+    lock_path = cached_lock_file(cloud_platform) if cloud_platform else None
+    if lock_path and os.path.exists(lock_path) and not os.path.exists(os.path.join(destination, LOCK_FILE)):
+        shutil.copy2(lock_path, os.path.join(destination, LOCK_FILE))
 
-def terraform_init(destination):
+def terraform_init(destination, cloud_platform=None):
+    seed_lock_file(destination, cloud_platform)
     try:
-        subprocess.run(["terraform", "init"], cwd=destination, check=True)
+        subprocess.run(["terraform", "init", "-input=false"], cwd=destination, env=terraform_env(), check=True)
         print("Terraform initialized successfully.")
     except subprocess.CalledProcessError as e:
         print(f"Terraform init failed: {e}")
 
+def user_cli_config_path():
+    """The CLI config Terraform would read without ours: $TF_CLI_CONFIG_FILE or ~/.terraformrc."""
+    configured = os.environ.get("TF_CLI_CONFIG_FILE")
+    if configured and os.path.abspath(configured) != os.path.abspath(CLI_CONFIG_FILE):
+        return configured
+    if platform.system().lower() == "windows":
+        return os.path.join(os.environ.get("APPDATA", ""), "terraform.rc")
+    return os.path.expanduser("~/.terraformrc")
+
+def write_cli_config(use_mirror=False):
+    """Write a Terraform CLI config with the shared plugin cache and, optionally, the local
+    filesystem mirror as the only install source for our providers (so init needs no network).
+
+    Terraform reads only one CLI config, so the user's own (credentials, host and
+    provider_installation blocks...) is carried over; only its plugin_cache_dir is replaced.
+    """
+    os.makedirs(PLUGIN_CACHE_DIR, exist_ok=True)
+    user_config = ""
+    user_config_path = user_cli_config_path()
+    if os.path.isfile(user_config_path):
+        with open(user_config_path) as f:
+            user_config = re.sub(r"(?m)^\s*plugin_cache_dir\s*=.*\n?", "", f.read()).strip()
+    lines = [f'plugin_cache_dir = "{PLUGIN_CACHE_DIR}"']
+    if user_config:
+        lines += [f"# Carried over from {user_config_path}", user_config]
+    if use_mirror:
+        sources = ", ".join(f'"registry.terraform.io/{source}"' for _, source, _ in PROVIDERS.values()
+                            if os.path.isdir(os.path.join(PROVIDER_MIRROR_DIR, "registry.terraform.io", source)))
+    if use_mirror and sources and re.search(r"(?m)^\s*provider_installation\s*\{", user_config):
+        # Only one provider_installation block is allowed; the user's wins
+        print(f"Warning: {user_config_path} has its own provider_installation block; not adding the local mirror.")
+    elif use_mirror and sources:
+        lines += [
+            "provider_installation {",
+            "  filesystem_mirror {",
+            f'    path    = "{PROVIDER_MIRROR_DIR}"',
+            f"    include = [{sources}]",
+            "  }",
+            "  direct {",
+            f"    exclude = [{sources}]",
+            "  }",
+            "}",
+        ]
+    # May now hold the user's credentials blocks, so keep it private like ~/.terraformrc should be
+    with open(os.open(CLI_CONFIG_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as f:
+        f.write("\n".join(lines) + "\n")
+    os.chmod(CLI_CONFIG_FILE, 0o600)
+
+def terraform_env():
+    """Environment for our terraform runs; points Terraform at the project-setup CLI config (which
+    includes the user's own CLI config) instead of editing ~/.terraformrc."""
+    env = dict(os.environ, TF_IN_AUTOMATION="1")
+    if os.path.exists(CLI_CONFIG_FILE):
+        env["TF_CLI_CONFIG_FILE"] = CLI_CONFIG_FILE
+    else:
+        env["TF_PLUGIN_CACHE_DIR"] = PLUGIN_CACHE_DIR
+    return env
+
+def cached_lock_file(cloud_platform):
+    return os.path.join(LOCK_CACHE_DIR, f"{cloud_platform}{LOCK_FILE}")
+
+def prewarm_provider(cloud_platform, use_mirror=False, refresh=False):
+    """Download a provider once into the shared plugin cache (and mirror), and keep the lock file
+    that pins the resolved version; later projects reuse both. Returns True if the cache is ready."""
+    lock_path = cached_lock_file(cloud_platform)
+    mirror_ready = not use_mirror or os.path.isdir(os.path.join(PROVIDER_MIRROR_DIR, "registry.terraform.io",
+                                                                PROVIDERS[cloud_platform][1]))
+    if os.path.exists(lock_path) and mirror_ready and not refresh:
+        return True
+
+    name, source, version = PROVIDERS[cloud_platform]
+    scratch = os.path.join(TERRAFORM_DIR, "prewarm", cloud_platform)
+    os.makedirs(scratch, exist_ok=True)
+    with open(os.path.join(scratch, "main.tf"), "w") as f:
+        f.write(f'terraform {{\n  required_providers {{\n    {name} = {{\n      source = "{source}"\n'
+                f'      version = "{version}"\n    }}\n  }}\n}}\n')
+    if refresh and os.path.exists(os.path.join(scratch, LOCK_FILE)):
+        os.remove(os.path.join(scratch, LOCK_FILE))
+
+    # Resolve and download through the registry once, even when init will later use the mirror
+    env = dict(os.environ, TF_IN_AUTOMATION="1", TF_PLUGIN_CACHE_DIR=PLUGIN_CACHE_DIR)
+    try:
+        print(f"Pre-warming provider cache for {source}...")
+        subprocess.run(["terraform", "init", "-input=false", "-backend=false"], cwd=scratch, env=env, check=True,
+                       stdout=subprocess.DEVNULL)
+        if use_mirror:
+            subprocess.run(["terraform", "providers", "mirror", PROVIDER_MIRROR_DIR], cwd=scratch, env=env,
+                           check=True, stdout=subprocess.DEVNULL)
+    except (subprocess.CalledProcessError, FileNotFoundError) as e:
+        print(f"Could not pre-warm {source}: {e}")
+        return False
+
+    os.makedirs(LOCK_CACHE_DIR, exist_ok=True)
+    shutil.copy2(os.path.join(scratch, LOCK_FILE), lock_path)
+    print(f"Pinned {source} lock file cached at {lock_path}")
+    return True
+
+def setup_provider_cache(platforms, use_mirror=False, refresh=False):
+    ready = all([prewarm_provider(cloud_platform, use_mirror, refresh) for cloud_platform in platforms])
+    write_cli_config(use_mirror)
+    return ready
+
 def get_cloud_platform():
     platforms = {
         1: 'aws',
@@ -252,7 +499,96 @@ def get_config_params(cloud_platform):
 
     return config_params
 
-def main():
+def load_spec(spec_path):
+    """Projects from a JSON or YAML spec: either a list of projects or {"defaults": {...}, "projects": [...]}.
+
+    Each project has "platform", "destination" and optional "params" (template values;
+    $VARS in them are expanded from the environment so secrets needn't live in the spec).
+    """
+    with open(spec_path) as f:
+        if spec_path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("PyYAML is required for YAML specs (pip install pyyaml), or use JSON")
+            spec = yaml.safe_load(f)
+        else:
+            spec = json.load(f)
+    if isinstance(spec, list):
+        spec = {"projects": spec}
+    defaults = spec.get("defaults", {})
+    projects = []
+    for number, entry in enumerate(spec.get("projects", []), 1):
+        project = dict(defaults, **entry)
+        project["params"] = {key: os.path.expandvars(str(value))
+                             for key, value in dict(defaults.get("params", {}), **entry.get("params", {})).items()}
+        project["platform"] = str(project.get("platform", "")).lower()
+        if project["platform"] not in TERRAFORM_TEMPLATES:
+            raise ValueError(f"Project {number}: unsupported platform '{project.get('platform')}'")
+        if not project.get("destination"):
+            raise ValueError(f"Project {number}: missing destination")
+        projects.append(project)
+    return projects
+
+def init_project(project):
+    """terraform init for one scaffolded project; output is captured so concurrent inits don't interleave."""
+    result = {"destination": project["destination"], "platform": project["platform"]}
+    started = time.monotonic()
+    try:
+        seed_lock_file(project["destination"], project["platform"])
+        completed = subprocess.run(["terraform", "init", "-input=false", "-no-color"], cwd=project["destination"],
+                                   env=terraform_env(), stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    except OSError as e:
+        # e.g. a missing project folder or terraform binary; fail this project, not the whole run
+        result.update(status="failed", init_seconds=round(time.monotonic() - started, 2), error=str(e))
+        return result
+    result["status"] = "ok" if completed.returncode == 0 else "failed"
+    result["init_seconds"] = round(time.monotonic() - started, 2)
+    if completed.returncode != 0:
+        result["error"] = completed.stdout.strip().splitlines()[-1] if completed.stdout.strip() else ""
+    return result
+
+def bulk_setup(spec_path, workers=DEFAULT_INIT_WORKERS, run_init=True, use_mirror=False, refresh=False,
+               report_path=None):
+    """Scaffold every project in a spec, then run their inits concurrently."""
+    projects = load_spec(spec_path)
+    started = time.monotonic()
+    results = []
+    for project in projects:
+        scaffolded = (create_folder(project["destination"])
+                      and write_terraform_config(project["platform"], project["destination"], project["params"]))
+        result = {"destination": project["destination"], "platform": project["platform"],
+                  "status": "scaffolded" if scaffolded else "failed"}
+        if not scaffolded:
+            result.update(init_seconds=0.0, error="scaffolding failed")
+        results.append(result)
+    print(f"Rendered {len(projects)} projects in {time.monotonic() - started:.2f}s")
+
+    scaffolded = [project for project, result in zip(projects, results) if result["status"] == "scaffolded"]
+    if run_init and scaffolded:
+        # The plugin cache isn't safe for concurrent installs, so fill it for every platform
+        # first; the parallel inits below then only read from it.
+        setup_provider_cache(sorted({project["platform"] for project in scaffolded}), use_mirror, refresh)
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            initialized = iter(list(executor.map(init_project, scaffolded)))
+        results = [next(initialized) if result["status"] == "scaffolded" else result for result in results]
+
+    if run_init:
+        print(f"\n{'project':40} {'platform':13} {'status':7} {'init':>8}")
+        for result in results:
+            print(f"{result['destination']:40} {result['platform']:13} {result['status']:7} "
+                  f"{result['init_seconds']:7.1f}s" + (f"  {result['error']}" if result.get("error") else ""))
+        failed = sum(result["status"] == "failed" for result in results)
+        print(f"\n{len(results) - failed} initialized, {failed} failed in {time.monotonic() - started:.1f}s")
+
+    if report_path:
+        with open(report_path, "w") as f:
+            json.dump({"spec": spec_path, "total_seconds": round(time.monotonic() - started, 2),
+                       "projects": results}, f, indent=2)
+        print(f"Report written to {report_path}")
+    return all(result["status"] != "failed" for result in results)
+
+def main(use_mirror=False, refresh=False):
     print("Welcome to Terraform Project Setup")
 
     if not is_terraform_installed():
@@ -260,6 +596,7 @@ def main():
         install_terraform()
 
     cloud_platform = get_cloud_platform()
+    setup_provider_cache([cloud_platform], use_mirror, refresh)
     
     destination_folder = input("Enter the destination folder path: ").strip()
 
@@ -269,7 +606,56 @@ def main():
     
     write_terraform_config(cloud_platform, destination_folder, config_params)
     
-    terraform_init(destination_folder)
+    terraform_init(destination_folder, cloud_platform)
+
+def cli(argv=None, prog=None):
+    """Command-line entry point; argv defaults to sys.argv[1:]."""
+    parser = argparse.ArgumentParser(prog=prog, description="Scaffold a Terraform project.")
+    parser.add_argument("--mirror", action="store_true",
+                        help=f"Populate and install providers from a local mirror ({PROVIDER_MIRROR_DIR}) so init works offline")
+    parser.add_argument("--refresh-providers", action="store_true",
+                        help="Re-resolve provider versions and regenerate the cached lock files")
+    parser.add_argument("--prewarm", nargs="*", choices=list(PROVIDERS), metavar="PLATFORM",
+                        help="Only fill the provider cache (default: all platforms) and exit")
+    parser.add_argument("--terraform-version", metavar="VERSION",
+                        help="Install (or switch to) this Terraform version from the verified local cache and exit")
+    parser.add_argument("--bin-dir", default="/usr/local/bin",
+                        help="Where --terraform-version links the terraform command (default: /usr/local/bin); "
+                             f"a bin dir outside $HOME uses the system-wide cache {SYSTEM_VERSIONS_DIR}")
+    parser.add_argument("--list-versions", action="store_true",
+                        help="List the Terraform versions cached for --bin-dir and exit")
+    parser.add_argument("--spec", help="Scaffold every project listed in this JSON/YAML spec, non-interactively")
+    parser.add_argument("--workers", type=int, default=DEFAULT_INIT_WORKERS,
+                        help=f"Concurrent terraform init runs with --spec (default: {DEFAULT_INIT_WORKERS})")
+    parser.add_argument("--no-init", action="store_true", help="With --spec, only write the project files")
+    parser.add_argument("--report", help="With --spec, write per-project timings as JSON")
+    args = parser.parse_args(argv)
+
+    if args.list_versions:
+        for version in cached_versions(versions_dir(args.bin_dir)):
+            print(version)
+        sys.exit(0)
+    if args.terraform_version:
+        try:
+            download_and_install_terraform(args.terraform_version, platform.system().lower(), args.bin_dir)
+        except (OSError, ValueError) as e:
+            print(f"Error installing Terraform {args.terraform_version}: {e}")
+            sys.exit(1)
+        sys.exit(0)
+    if args.spec:
+        if not is_terraform_installed() and not args.no_init:
+            print("Terraform is not installed. Installing Terraform...")
+            install_terraform()
+        try:
+            ok = bulk_setup(args.spec, args.workers, not args.no_init, args.mirror, args.refresh_providers, args.report)
+        except (OSError, ValueError) as e:
+            print(f"Error reading spec: {e}")
+            ok = False
+        sys.exit(0 if ok else 1)
+    if args.prewarm is not None:
+        ok = setup_provider_cache(args.prewarm or list(PROVIDERS), args.mirror, args.refresh_providers)
+        sys.exit(0 if ok else 1)
+    main(args.mirror, args.refresh_providers)
 
 if __name__ == "__main__":
-    main()
+    cli()
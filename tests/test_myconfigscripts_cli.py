@@ -0,0 +1,51 @@
+import importlib.util
+import io
+import os
+import subprocess
+import sys
+import unittest
+from contextlib import redirect_stdout
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI_PATH = os.path.join(REPO_DIR, "myconfigscripts-cli.py")
+# Subcommands that must stay cheap to start: none of them needs requests, PIL or tkinter at import
+LIGHT_TOOLS = ["webp", "lvm-recover", "crypto-policy", "pyinstaller", "tf-setup"]
+HEAVY_MODULES = ["requests", "PIL", "tkinter"]
+# Generous enough for a slow CI runner; the light tools import in well under 100ms
+IMPORT_BUDGET_MS = 300
+
+spec = importlib.util.spec_from_file_location("myconfigscripts_cli", CLI_PATH)
+dispatcher = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(dispatcher)
+
+
+def loaded_modules(*commands):
+    """Top-level modules loaded by a fresh interpreter importing the dispatcher and the given tools."""
+    code = ("import importlib.util, sys\n"
+            f"spec = importlib.util.spec_from_file_location('myconfigscripts_cli', {CLI_PATH!r})\n"
+            "cli = importlib.util.module_from_spec(spec)\n"
+            "spec.loader.exec_module(cli)\n"
+            f"for command in {list(commands)!r}:\n"
+            "    cli.load_tool(command)\n"
+            "print('\\n'.join(sorted({name.split('.')[0] for name in sys.modules})))\n")
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, universal_newlines=True, check=True)
+    return set(completed.stdout.split())
+
+
+class ImportCostTest(unittest.TestCase):
+    def test_dispatcher_loads_no_tool_dependencies(self):
+        self.assertFalse(loaded_modules() & set(HEAVY_MODULES))
+
+    def test_light_tools_load_no_heavy_dependencies(self):
+        for command in LIGHT_TOOLS:
+            with self.subTest(command=command):
+                self.assertFalse(loaded_modules(command) & set(HEAVY_MODULES))
+
+    def test_light_tools_within_import_budget(self):
+        with redirect_stdout(io.StringIO()) as output:
+            status = dispatcher.main(["--importtime"] + LIGHT_TOOLS + ["--budget-ms", str(IMPORT_BUDGET_MS)])
+        self.assertEqual(status, 0, output.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
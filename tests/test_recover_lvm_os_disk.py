@@ -0,0 +1,55 @@
+import importlib.util
+import io
+import os
+import unittest
+from contextlib import redirect_stdout
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Recorded lsblk/pvs/lvs output from a rescue VM:
+#   sda  running OS disk: sda2 is rootvg, with rootlv mounted on /
+#   sdb  resource disk, ext4 on /mnt
+#   sdc  clone of the OS disk: sdc2 has sda2's PV UUID, so pvs hides it as a duplicate
+#   sdd  data disk: datavg holds only datalv
+#   sde  OS disk of another VM: osvg holds rootlv and varlv
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "lvm-rescue-vm")
+
+spec = importlib.util.spec_from_file_location("recover_lvm_os_disk", os.path.join(REPO_DIR, "Recover-LVM-OS-Disk.py"))
+recover = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(recover)
+
+
+class BlockDeviceIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = recover.discover_block_devices(FIXTURE_DIR)
+
+    def test_candidates_are_unmounted_pvs_with_the_lv(self):
+        self.assertEqual(self.index.candidates(), ["/dev/sdc2", "/dev/sde2"])
+        self.assertEqual(self.index.candidates("varlv"), ["/dev/sde2"])
+        self.assertEqual(self.index.candidates("datalv"), ["/dev/sdd1"])
+        self.assertEqual(self.index.candidates("missinglv"), [])
+
+    def test_duplicate_pv_uuid_clone_resolves_to_original_vg(self):
+        self.assertNotIn("/dev/sdc2", self.index.pvs)
+        self.assertEqual(self.index.vg_for("/dev/sdc2"), "rootvg")
+
+    def test_lv_names_for(self):
+        self.assertEqual(self.index.lv_names_for("/dev/sdc2"), ["homelv", "rootlv"])
+        self.assertEqual(self.index.lv_names_for("/dev/sde2"), ["rootlv", "varlv"])
+        self.assertEqual(self.index.lv_names_for("/dev/sdd1"), ["datalv"])
+        self.assertEqual(self.index.lv_names_for("/dev/sdb1"), [])
+
+    def test_running_os_disk_is_never_a_candidate(self):
+        # sda2 itself isn't mounted, but the LVs stacked on it are
+        self.assertIn("rootlv", self.index.lv_names_for("/dev/sda2"))
+        self.assertNotIn("/dev/sda2", self.index.candidates())
+
+    def test_discover_cli_with_fixture(self):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            recover.cli(["--discover", "--fixture", FIXTURE_DIR])
+        self.assertIn("Recovery candidates (unmounted PVs whose VG has 'rootlv'): /dev/sdc2, /dev/sde2",
+                      output.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()